@@ -1,7 +1,24 @@
 import graph
+import logs
+import search
+import solutions
 
 
-def get_movement_from_array(arr, logging=True, optimal=False):
+def get_movement_from_array(
+    arr,
+    logging=True,
+    optimal=False,
+    workers=0,
+    cache=True,
+    stats=None,
+    engine="dfs",
+    budget=None,
+):
+    # stats, a stats.Stats, is filled with the counters of the search, so
+    # with stats the level is always searched, never taken from the store
+    # engine "dfs" is graph.Node, "astar" is search.AStar (no workers)
+    # budget, a budget.Budget, stops the search early with the best solution
+    # found so far, the search runs in this process so it can be cancelled
     start = None
     end = None
 
@@ -16,15 +33,55 @@ def get_movement_from_array(arr, logging=True, optimal=False):
         print("No start or end found")
         return ""
 
-    player = graph.Node(arr, start, end, logging=logging, optimal=optimal)
+    if cache and stats is None:
+        movement = solutions.get_store().get(arr, optimal, engine)
+        if movement is not None:
+            if logging:
+                print("Using stored solution")
+            if budget is not None:
+                budget.found(movement)
+            return movement
+
+    if logging and not logs.LOGGER.handlers:
+        logs.setup()
+
+    if engine == "astar":
+        player = search.AStar(
+            arr,
+            start,
+            end,
+            weight=1 if optimal else 2,
+            logging=logging,
+            stats=stats,
+            budget=budget,
+        )
+    else:
+        player = graph.Node(
+            arr,
+            start,
+            end,
+            logging=logging,
+            optimal=optimal,
+            stats=stats,
+            budget=budget,
+        )
 
     # solve
-    result = player.solve()
+    if workers > 1 and engine != "astar" and budget is None:
+        result = player.solve_parallel(workers)
+    else:
+        result = player.solve()
 
     # get movement
     if result:
         movement = player.movement
+    elif budget is not None and budget.best is not None:
+        movement = budget.best
     else:
         movement = ""
 
+    # a shorter solution or one at all may be past the budget
+    if cache and (budget is None or not budget.exhausted):
+        solutions.get_store().put(arr, optimal, movement, engine)
+
     return movement
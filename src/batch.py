@@ -0,0 +1,115 @@
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import ai
+import offline
+import solutions
+from budget import Budget
+from stats import Stats
+
+LEVELS = os.path.join(os.path.dirname(__file__), "..", "levels")
+
+
+def solve_level(path: str, optimal=False, engine="dfs", timeout=None):
+    # runs in a worker that solves other levels too, nothing leaks between
+    # them: the memo, stats and budget belong to each search
+    board = offline.load_board(path)
+    stats = Stats()
+    budget = Budget(deadline=timeout)
+
+    start_time = time.perf_counter()
+    movement = ai.get_movement_from_array(
+        board,
+        logging=False,
+        optimal=optimal,
+        cache=False,
+        stats=stats,
+        engine=engine,
+        budget=budget,
+    )
+    end_time = time.perf_counter()
+
+    result = {
+        "level": path,
+        "solved": movement != "",
+        "length": len(movement),
+        "movement": movement,
+        "time_ms": round((end_time - start_time) * 1000, 2),
+        "stats": stats.as_dict(),
+        "board": ["".join(row) for row in board],
+    }
+    # the movement is the best found before the timeout, maybe not optimal
+    if budget.exhausted:
+        result["timeout"] = timeout
+    return result
+
+
+def solve_batch(
+    paths,
+    output=sys.stdout,
+    optimal=False,
+    engine="dfs",
+    workers=None,
+    timeout=None,
+    store=False,
+):
+    # results are written as soon as each level is done, in that order
+    paths = offline.find_levels(paths)
+    results = []
+
+    with ProcessPoolExecutor(workers) as executor:
+        futures = {
+            executor.submit(solve_level, path, optimal, engine, timeout): path
+            for path in paths
+        }
+
+        for future in as_completed(futures):
+            try:
+                result = future.result()
+            except Exception as error:
+                result = {"level": futures[future], "error": repr(error)}
+
+            board = result.pop("board", None)
+            if store and result.get("solved") and "timeout" not in result:
+                solutions.get_store().put(board, optimal, result["movement"], engine)
+
+            result.update({"optimal": optimal, "engine": engine})
+            output.write(json.dumps(result, ensure_ascii=False) + "\n")
+            output.flush()
+            results.append(result)
+
+    return results
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+
+    if "--help" in args:
+        print("Usage: python src/batch.py [--optimal] [--astar] [--store]")
+        print("       [--workers=N] [--timeout=SECONDS] [--output=FILE] [paths...]")
+        sys.exit(0)
+
+    paths = [arg for arg in args if not arg.startswith("--")] or [LEVELS]
+    workers = next(
+        (int(arg[10:]) for arg in args if arg.startswith("--workers=")), None
+    )
+    timeout = next(
+        (float(arg[10:]) for arg in args if arg.startswith("--timeout=")), None
+    )
+    output = next((arg[9:] for arg in args if arg.startswith("--output=")), None)
+
+    file = open(output, "w") if output else sys.stdout
+    solve_batch(
+        paths,
+        file,
+        "--optimal" in args,
+        "astar" if "--astar" in args else "dfs",
+        workers,
+        timeout,
+        "--store" in args,
+    )
+    if output:
+        file.close()
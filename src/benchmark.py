@@ -0,0 +1,202 @@
+import json
+import multiprocessing
+import os
+import subprocess
+import sys
+import time
+import tracemalloc
+
+import graph
+import offline
+import search
+from stats import Stats
+
+LEVELS = os.path.join(os.path.dirname(__file__), "..", "levels")
+# mode -> (engine, optimal)
+MODES = {
+    "greedy": ("dfs", False),
+    "optimal": ("dfs", True),
+    "astar": ("astar", True),
+    "astar-greedy": ("astar", False),
+}
+
+# solving must not load the vision or browser dependencies
+IMPORT_MODULES = ("ai", "main", "offline")
+HEAVY_MODULES = ("cv2", "numpy", "selenium")
+IMPORT_SCRIPT = """
+import json, sys, time
+start = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - start
+heavy = [name for name in {heavy!r} if name in sys.modules]
+print(json.dumps({{"import_ms": elapsed * 1000, "heavy": heavy}}))
+"""
+
+
+def find_ends(board):
+    start = None
+    end = None
+    for row in range(len(board)):
+        for col in range(len(board[row])):
+            if board[row][col] == "#":
+                start = (row, col)
+            elif board[row][col] == "E":
+                end = (row, col)
+    return start, end
+
+
+def run(board, engine="dfs", optimal=False, memory=False):
+    start, end = find_ends(board)
+    stats = Stats(timers=not memory)
+
+    if memory:
+        tracemalloc.start()
+
+    start_time = time.perf_counter()
+    if engine == "astar":
+        weight = 1 if optimal else 2
+        node = search.AStar(
+            board, start, end, weight=weight, logging=False, stats=stats
+        )
+    else:
+        node = graph.Node(
+            board, start, end, logging=False, optimal=optimal, stats=stats
+        )
+    solved = node.solve()
+    end_time = time.perf_counter()
+
+    result = {
+        "solved": solved,
+        "length": len(node.movement) if solved else None,
+        "movement": node.movement if solved else "",
+        "wall_ms": round((end_time - start_time) * 1000, 2),
+        **stats.as_dict(),
+    }
+
+    if memory:
+        result["peak_kib"] = tracemalloc.get_traced_memory()[1] // 1024
+        tracemalloc.stop()
+
+    return result
+
+
+def measure(connection, board, mode, memory):
+    # tracing allocations slows the search down, so the memory is measured
+    # on a second run and the first one gives the time
+    engine, optimal = MODES[mode]
+    result = run(board, engine, optimal)
+    if memory:
+        result["peak_kib"] = run(board, engine, optimal, memory=True)["peak_kib"]
+    connection.send(result)
+
+
+def benchmark(path, mode, timeout=60, memory=True):
+    # every run gets a fresh process so levels can't warm up each other and
+    # a level that takes too long can be stopped
+    board = offline.load_board(path)
+    receiver, sender = multiprocessing.Pipe(False)
+    process = multiprocessing.Process(
+        target=measure, args=(sender, board, mode, memory)
+    )
+    process.start()
+
+    if receiver.poll(timeout):
+        result = receiver.recv()
+    else:
+        result = {"timeout": timeout}
+
+    process.terminate()
+    process.join()
+
+    return {
+        "level": os.path.basename(path),
+        "mode": mode,
+        "version": graph.SOLVER_VERSION,
+        **result,
+    }
+
+
+def check_imports(module: str, budget_ms=100, repeat=5):
+    # best time of a few fresh interpreters, so caches are cold every time
+    times = []
+    heavy = []
+    for _ in range(repeat):
+        process = subprocess.run(
+            [
+                sys.executable,
+                "-c",
+                IMPORT_SCRIPT.format(module=module, heavy=HEAVY_MODULES),
+            ],
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+        result = json.loads(process.stdout)
+        times.append(result["import_ms"])
+        heavy = result["heavy"]
+
+    return {
+        "module": module,
+        "import_ms": round(min(times), 2),
+        "budget_ms": budget_ms,
+        "heavy_modules": heavy,
+        "ok": min(times) <= budget_ms and not heavy,
+    }
+
+
+def capture_levels(directory=LEVELS):
+    # the game levels can only be read from the game itself
+    from browser import Browser
+    import image_processing as img_proc
+
+    browser = Browser()
+    for lvl in range(1, 21):
+        browser.select_level(lvl)
+        board = browser.wait_until_ready()
+        if board is None:
+            print(f"Level {lvl} didn't look ready in time, capturing it anyway")
+            board = img_proc.process_board(browser.get_board())
+        with open(os.path.join(directory, f"game_{lvl:02d}.txt"), "w") as file:
+            file.write("\n".join("".join(row) for row in board) + "\n")
+        print(f"Captured level {lvl}")
+    browser.close()
+
+
+def get_option(args, name, default):
+    for arg in args:
+        if arg.startswith(f"{name}="):
+            return arg.split("=", 1)[1]
+    return default
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+
+    if "--capture" in args:
+        capture_levels()
+        sys.exit(0)
+
+    if any(arg.startswith("--imports") for arg in args):
+        budget = float(get_option(args, "--imports", 100))
+        results = [check_imports(module, budget) for module in IMPORT_MODULES]
+        for result in results:
+            print(json.dumps(result))
+        sys.exit(0 if all(result["ok"] for result in results) else 1)
+
+    paths = offline.find_levels(
+        [arg for arg in args if not arg.startswith("--")] or [LEVELS]
+    )
+    modes = get_option(args, "--modes", "greedy,optimal,astar").split(",")
+    timeout = float(get_option(args, "--timeout", 60))
+    output = get_option(args, "--output", None)
+
+    file = open(output, "w") if output else sys.stdout
+    for path in paths:
+        for mode in modes:
+            result = benchmark(path, mode, timeout, "--no-memory" not in args)
+            file.write(json.dumps(result, ensure_ascii=False) + "\n")
+            file.flush()
+
+    if output:
+        file.close()
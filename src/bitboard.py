@@ -0,0 +1,414 @@
+from collections import OrderedDict
+from random import Random
+from typing import Dict, List, NamedTuple, Tuple
+
+from utils import UP, DOWN, LEFT, RIGHT
+
+MOVEMENTS = {UP: (-1, 0), DOWN: (1, 0), LEFT: (0, -1), RIGHT: (0, 1)}
+OPPOSITE = {UP: DOWN, DOWN: UP, LEFT: RIGHT, RIGHT: LEFT}
+
+
+class State(NamedTuple):
+    # one bit per cell, bit index is x * cols + y
+    walls: int
+    diamonds: int
+    keys: int
+    doors: int
+    gates: int
+    buttons: int
+    spikes: int
+    rocks: int
+    holes: int
+    lava: int
+    exits: int
+
+    # player
+    pos: int
+    has_key: bool
+    diamonds_left: int
+
+    # zobrist hash of all the fields above
+    zobrist: int = 0
+
+
+MASKS = State._fields[:11]
+
+
+class Level:
+    def __init__(self, rows: int, cols: int):
+        self.rows = rows
+        self.cols = cols
+        self.size = rows * cols
+
+        # neighbors in the same order as Cell.update_neighbors
+        self.neighbors: List[List[Tuple[int, str]]] = []
+        for i in range(self.size):
+            x, y = divmod(i, cols)
+            neighbors = []
+            if x < rows - 1:
+                neighbors.append((i + cols, DOWN))
+            if x > 0:
+                neighbors.append((i - cols, UP))
+            if y < cols - 1:
+                neighbors.append((i + 1, RIGHT))
+            if y > 0:
+                neighbors.append((i - 1, LEFT))
+            self.neighbors.append(neighbors)
+
+        # fixed seed so the same level always hashes the same
+        random = Random(self.size)
+        self.zobrist: Dict[str, List[int]] = {
+            name: [random.getrandbits(64) for _ in range(self.size)] for name in MASKS
+        }
+        self.zobrist_pos = [random.getrandbits(64) for _ in range(self.size)]
+        self.zobrist_key = random.getrandbits(64)
+
+        # filled by analyse when the level is created
+        self.static_walls = 0
+        self.dead = 0
+
+        # masks for shifting a whole mask one cell without wrapping rows
+        self.board = (1 << self.size) - 1
+        first_col = sum(1 << (x * cols) for x in range(rows))
+        self.not_first_col = self.board & ~first_col
+        self.not_last_col = self.board & ~(first_col << (cols - 1))
+
+        # walls -> connected components of the walkable cells, least recently
+        # used layouts go first
+        self.max_components = 4096
+        self.components: "OrderedDict[int, List[int]]" = OrderedDict()
+
+    def index(self, pos: Tuple[int, int]):
+        return pos[0] * self.cols + pos[1]
+
+    def position(self, index: int):
+        return divmod(index, self.cols)
+
+    def step(self, index: int, direction: str):
+        x, y = divmod(index, self.cols)
+        dx, dy = MOVEMENTS[direction]
+        x, y = x + dx, y + dy
+
+        if x < 0 or x >= self.rows or y < 0 or y >= self.cols:
+            return None
+        return x * self.cols + y
+
+    def create(self, grid, start: Tuple[int, int], has_key: bool, diamonds: int):
+        masks = {
+            "walls": 0,
+            "diamonds": 0,
+            "keys": 0,
+            "doors": 0,
+            "gates": 0,
+            "buttons": 0,
+            "spikes": 0,
+            "rocks": 0,
+            "holes": 0,
+            "lava": 0,
+            "exits": 0,
+        }
+
+        for row in grid:
+            for cell in row:
+                bit = 1 << self.index(cell.get_pos())
+                masks["walls"] |= bit if cell.is_blocked() else 0
+                masks["diamonds"] |= bit if cell.isdiamond else 0
+                masks["keys"] |= bit if cell.iskey else 0
+                masks["doors"] |= bit if cell.isdoor else 0
+                masks["gates"] |= bit if cell.isgate else 0
+                masks["buttons"] |= bit if cell.isbutton else 0
+                masks["spikes"] |= bit if cell.isspike else 0
+                masks["rocks"] |= bit if cell.isrock else 0
+                masks["holes"] |= bit if cell.ishole else 0
+                masks["lava"] |= bit if cell.islava else 0
+                masks["exits"] |= bit if cell.isexit else 0
+
+        state = State(
+            pos=self.index(start), has_key=has_key, diamonds_left=diamonds, **masks
+        )
+        self.analyse(state)
+        return state._replace(zobrist=self.hash(state))
+
+    def analyse(self, state: State):
+        # walls that stay walls whatever happens, everything else may open or
+        # take a rock, and the cells where a rock could never be pushed again
+        self.static_walls = state.walls & ~(
+            state.doors
+            | state.gates
+            | state.spikes
+            | state.rocks
+            | state.holes
+            | state.lava
+            | state.buttons
+            | state.exits
+        )
+
+        self.dead = 0
+        for i in range(self.size):
+            if not self.static_walls >> i & 1 and self.frozen(i, 0):
+                self.dead |= 1 << i
+
+    def frozen(self, cell: int, rocks: int, seen: int = 0):
+        # a rock can't move along an axis with a static wall or a frozen rock
+        # on either side, rocks already being checked count as walls
+        seen |= 1 << cell
+        for axis in ((UP, DOWN), (LEFT, RIGHT)):
+            blocked = False
+            for direction in axis:
+                neighbor = self.step(cell, direction)
+                if neighbor is None or self.static_walls >> neighbor & 1:
+                    blocked = True
+                elif rocks >> neighbor & 1:
+                    blocked = seen >> neighbor & 1 or self.frozen(neighbor, rocks, seen)
+                if blocked:
+                    break
+
+            if not blocked:
+                return False
+        return True
+
+    def buries_diamond(self, state: State, rock: int, target: int):
+        # a diamond under a rock that can never move again can't be collected
+        if not state.diamonds >> target & 1:
+            return False
+        if self.dead >> target & 1:
+            return True
+
+        rocks = state.rocks & ~(1 << rock) | 1 << target
+        return self.frozen(target, rocks)
+
+    def hash(self, state: State):
+        zobrist = self.zobrist_pos[state.pos]
+        if state.has_key:
+            zobrist ^= self.zobrist_key
+
+        for name in MASKS:
+            keys = self.zobrist[name]
+            for i in self.cells(getattr(state, name)):
+                zobrist ^= keys[i]
+
+        return zobrist
+
+    def replace(self, state: State, **changes):
+        # like State._replace but updates the hash with only the changed bits
+        zobrist = state.zobrist
+
+        for name, value in changes.items():
+            if name in self.zobrist:
+                keys = self.zobrist[name]
+                for i in self.cells(getattr(state, name) ^ value):
+                    zobrist ^= keys[i]
+            elif name == "pos" and value != state.pos:
+                zobrist ^= self.zobrist_pos[state.pos] ^ self.zobrist_pos[value]
+            elif name == "has_key" and value != state.has_key:
+                zobrist ^= self.zobrist_key
+
+        return state._replace(zobrist=zobrist, **changes)
+
+    def walk(self, state: State, path: str):
+        walls = state.walls
+        diamonds = state.diamonds
+        keys = state.keys
+        gates = state.gates
+        pos = state.pos
+        has_key = state.has_key
+        diamonds_left = state.diamonds_left
+
+        for direction in path:
+            pos = self.step(pos, direction)
+            bit = 1 << pos
+
+            if keys & bit and not has_key:
+                has_key = True
+                keys &= ~bit
+            elif diamonds & bit:
+                diamonds_left -= 1
+                diamonds &= ~bit
+            elif state.spikes & bit:
+                walls |= bit
+            elif gates & bit and has_key:
+                walls &= ~bit
+                gates &= ~bit
+                has_key = False
+
+        return self.replace(
+            state,
+            walls=walls,
+            diamonds=diamonds,
+            keys=keys,
+            gates=gates,
+            pos=pos,
+            has_key=has_key,
+            diamonds_left=diamonds_left,
+        )
+
+    def push(self, state: State, target: int):
+        # rock under the player is pushed into target, returns None if it can't
+        rock = 1 << state.pos
+        bit = 1 << target
+
+        if not (state.holes & bit or not state.walls & bit or state.lava & bit):
+            return None
+
+        walls = state.walls
+        rocks = state.rocks & ~rock
+        holes = state.holes
+        if not state.spikes & rock:
+            walls &= ~rock
+
+        if holes & bit:
+            walls &= ~bit
+            holes &= ~bit
+        elif state.lava & bit:
+            pass
+        elif state.buttons & bit:
+            walls |= bit
+        elif not walls & bit:
+            walls |= bit
+            rocks |= bit
+
+        return self.replace(state, walls=walls, rocks=rocks, holes=holes)
+
+    def open_door(self, state: State, door: int):
+        return self.replace(state, walls=state.walls & ~(1 << door))
+
+    def grow(self, mask: int):
+        # the mask plus every cell next to it
+        cols = self.cols
+        grown = mask | mask << cols | mask >> cols
+        grown |= (mask << 1) & self.not_first_col | (mask >> 1) & self.not_last_col
+        return grown & self.board
+
+    def label(self, walls: int):
+        components = self.components.get(walls)
+        if components is not None:
+            self.components.move_to_end(walls)
+            return components
+
+        components = []
+        free = self.board & ~walls
+        while free:
+            component = free & -free
+            while True:
+                grown = self.grow(component) & free
+                if grown == component:
+                    break
+                component = grown
+            components.append(component)
+            free &= ~component
+
+        self.components[walls] = components
+        while len(self.components) > self.max_components:
+            self.components.popitem(last=False)
+        return components
+
+    def reachable(self, state: State):
+        # cells the player can walk to, the player may stand on a wall (a
+        # spike or an opened gate) so its neighbors are used then
+        pos = 1 << state.pos
+        start = self.grow(pos) if state.walls & pos else pos
+
+        reach = pos
+        for component in self.label(state.walls):
+            if component & start:
+                reach |= component
+        return reach
+
+    def explore(self, state: State):
+        # one breadth first search from the player answering every path query
+        # of a node, gates and exits can only be the last step of a path
+        walls = state.walls
+        ends = state.gates if state.has_key else 0
+        ends |= state.exits if state.diamonds_left == 0 else 0
+        targets = self.targets(state)
+
+        # cell -> (parent, direction, distance, whether a target is on the way)
+        tree: Dict[int, Tuple[int, str, int, bool]] = {state.pos: (-1, "", 0, False)}
+
+        # no search when no target or rock is next to the player's component
+        if not (targets | state.rocks) & self.grow(self.reachable(state)):
+            return tree
+        frontier = [state.pos]
+        distance = 0
+
+        while frontier:
+            distance += 1
+            next_frontier = []
+
+            for current in frontier:
+                covered = tree[current][3] or targets >> current & 1 == 1
+
+                for neighbor, direction in self.neighbors[current]:
+                    if neighbor in tree:
+                        continue
+
+                    bit = 1 << neighbor
+                    if walls & bit and not ends & bit:
+                        continue
+
+                    tree[neighbor] = (current, direction, distance, covered)
+                    if not walls & bit:
+                        next_frontier.append(neighbor)
+
+            frontier = next_frontier
+
+        return tree
+
+    def moves(self, state: State, tree, rocks):
+        # moves are (length, end cell, push direction) sorted by length, rocks
+        # are visited in the given order so ties keep the caller's order
+        moves: List[Tuple[int, int, str]] = []
+        targets = self.targets(state)
+
+        for target in self.cells(targets):
+            if target not in tree:
+                continue
+
+            # skip targets whose path goes through another target
+            _, _, distance, covered = tree[target]
+            if not covered:
+                moves.append((distance, target, ""))
+
+        for rock in rocks:
+            for neighbor, direction in self.neighbors[rock]:
+                if state.walls & (1 << neighbor) or neighbor not in tree:
+                    continue
+
+                _, _, distance, covered = tree[neighbor]
+                if covered or targets & (1 << neighbor):
+                    continue
+
+                # push from the neighbor towards the opposite side of the rock
+                push = OPPOSITE[direction]
+                opposite = self.step(rock, push)
+                if opposite is None:
+                    continue
+
+                bit = 1 << opposite
+                if not state.walls & bit or state.holes & bit or state.lava & bit:
+                    if self.buries_diamond(state, rock, opposite):
+                        continue
+                    moves.append((distance + 1, neighbor, push))
+
+        moves.sort(key=lambda x: x[0])
+        return moves
+
+    def targets(self, state: State):
+        targets = state.diamonds
+        targets |= state.exits if state.diamonds_left == 0 else 0
+        targets |= state.gates if state.has_key else state.keys
+        return targets & ~(1 << state.pos)
+
+    def get_path(self, tree: Dict[int, Tuple[int, str, int, bool]], end: int):
+        path = []
+        while True:
+            end, direction = tree[end][:2]
+            if end == -1:
+                return "".join(reversed(path))
+            path.append(direction)
+
+    def cells(self, mask: int):
+        while mask:
+            low = mask & -mask
+            yield low.bit_length() - 1
+            mask ^= low
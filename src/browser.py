@@ -1,13 +1,72 @@
+import base64
+import time
+
 from cv2 import cv2 as cv
 import numpy as np
 from selenium import webdriver
+from selenium.common.exceptions import WebDriverException
 from selenium.webdriver.common.action_chains import ActionChains
 from selenium.webdriver.common.keys import Keys
+
+import image_processing as img_proc
 from utils import UP, DOWN, LEFT, RIGHT
 
+# copies the canvas (or the region given as fractions of its size, rounded
+# down like crop_img) into a 2d canvas and returns its raw RGBA bytes
+READ_PIXELS = """
+const canvas = document.querySelector("canvas");
+const crop = arguments[0];
+const x = Math.floor(crop[0] * canvas.width);
+const y = Math.floor(crop[1] * canvas.height);
+const width = Math.floor(crop[2] * canvas.width) - x;
+const height = Math.floor(crop[3] * canvas.height) - y;
+
+const copy = document.createElement("canvas");
+copy.width = width;
+copy.height = height;
+const context = copy.getContext("2d");
+context.drawImage(canvas, x, y, width, height, 0, 0, width, height);
+const data = context.getImageData(0, 0, width, height).data;
+
+let binary = "";
+for (let i = 0; i < data.length; i += 0x8000) {
+    binary += String.fromCharCode.apply(null, data.subarray(i, i + 0x8000));
+}
+return [width, height, btoa(binary)];
+"""
+
+# cheap fingerprint of the canvas, a 32 bit FNV-1a hash of a 32x48 copy, null
+# while there is no canvas with a size yet
+CANVAS_HASH = """
+const canvas = document.querySelector("canvas");
+if (!canvas || !canvas.width || !canvas.height) {
+    return null;
+}
+
+const copy = document.createElement("canvas");
+copy.width = 32;
+copy.height = 48;
+const context = copy.getContext("2d");
+context.drawImage(canvas, 0, 0, 32, 48);
+const data = context.getImageData(0, 0, 32, 48).data;
+
+let hash = 0x811c9dc5;
+for (let i = 0; i < data.length; i++) {
+    hash = Math.imul(hash ^ data[i], 0x01000193) >>> 0;
+}
+return hash;
+"""
+
 
 class Browser:
-    def __init__(self):
+    def __init__(self, press_time=0.13, release_time=0.13, capture="screenshot"):
+        # "screenshot" decodes a PNG of the canvas, "pixels" reads it in-page
+        self.capture = capture
+
+        # seconds a key is held down and then released for each move
+        self.press_time = press_time
+        self.release_time = release_time
+
         self.driver = webdriver.Firefox()
         self.driver.get("https://www.miniplay.com/embed/diamond-rush")
 
@@ -25,6 +84,8 @@ class Browser:
         self.driver.close()
 
     def select_level(self, level):
+        # written by the game frame, like unlock_all_levels, the refresh goes
+        # back to the page so the frame is entered again after it
         script = f"window.localStorage.setItem('levelToStart','Level {level}')"
         self.driver.execute_script(script)
         self.driver.refresh()
@@ -32,21 +93,124 @@ class Browser:
         iframe = self.driver.find_element("css selector", "iframe")
         self.driver.switch_to.frame(iframe)
 
-    def move(self, movements):
-        actions = ActionChains(self.driver)
+    def move(self, movements, press_time=None, release_time=None, verify=None):
+        # all the keys go in one action chain unless every move must be
+        # checked with verify(index, move), which stops the playback on False
+        press_time = self.press_time if press_time is None else press_time
+        release_time = self.release_time if release_time is None else release_time
+
+        if movements == "":
+            return True
+
+        if verify is None:
+            actions = ActionChains(self.driver)
+            for move in movements:
+                self.add_key(actions, move, press_time, release_time)
+            actions.perform()
+            return True
+
+        for i, move in enumerate(movements):
+            actions = ActionChains(self.driver)
+            self.add_key(actions, move, press_time, release_time)
+            actions.perform()
+
+            if not verify(i, move):
+                return False
+
+        return True
 
-        for move in movements:
-            move = self.map_moves[move]
-            actions.key_down(move).pause(0.13).perform()
-            actions.key_up(move).pause(0.13).perform()
+    def add_key(self, actions, move, press_time, release_time):
+        key = self.map_moves[move]
+        actions.key_down(key).pause(press_time)
+        actions.key_up(key).pause(release_time)
+
+    def get_board(self, crop=None, capture=None):
+        # crop takes the crop_img arguments, e.g. img_proc.BOARD_CROP
+        capture = self.capture if capture is None else capture
+
+        if capture == "pixels":
+            return self.read_pixels(crop)
 
-    def get_board(self):
         canvas = self.driver.find_element("css selector", "canvas")
         screenshot = canvas.screenshot_as_png
         img = np.frombuffer(screenshot, dtype=np.uint8)
         img = cv.imdecode(img, cv.IMREAD_COLOR)
+
+        if crop is not None:
+            img = img_proc.crop_img(img, **crop)
         return img
 
+    def read_pixels(self, crop=None):
+        region = [0, 0, 1, 1]
+        if crop is not None:
+            cols, rows = crop["cols"], crop["rows"]
+            region = [
+                crop.get("left", 0) / cols,
+                crop.get("top", 0) / rows,
+                (cols - crop.get("right", 0)) / cols,
+                (rows - crop.get("bottom", 0)) / rows,
+            ]
+
+        width, height, data = self.driver.execute_script(READ_PIXELS, region)
+        img = np.frombuffer(base64.b64decode(data), dtype=np.uint8)
+        img = img.reshape(height, width, 4)
+        return cv.cvtColor(img, cv.COLOR_RGBA2BGR)
+
+    def measure_capture(self, repeat=10):
+        # average seconds to capture the cropped board with each backend
+        timings = {}
+        for capture in ("screenshot", "pixels"):
+            start = time.perf_counter()
+            for _ in range(repeat):
+                self.get_board(img_proc.BOARD_CROP, capture)
+            timings[capture] = (time.perf_counter() - start) / repeat
+        return timings
+
+    def canvas_hash(self):
+        try:
+            return self.driver.execute_script(CANVAS_HASH)
+        except WebDriverException:
+            return None
+
+    def wait_until_ready(self, timeout=10, interval=0.1, polls=3, recognizer=None):
+        # polls until the board has a player and an exit and reads the same
+        # for polls captures in a row, returns it or None after timeout, the
+        # board is only captured again when the canvas hash changes
+        recognizer = img_proc.BoardRecognizer() if recognizer is None else recognizer
+        deadline = time.perf_counter() + timeout
+
+        last_hash = None
+        last_board = None
+        same = 0
+
+        while time.perf_counter() < deadline:
+            canvas_hash = self.canvas_hash()
+
+            if canvas_hash is None:
+                board = None
+            elif canvas_hash == last_hash:
+                board = last_board
+            else:
+                image = self.get_board(img_proc.BOARD_CROP)
+                board = recognizer.process_board(image, cropped=True)
+
+            playable = board is not None and all(
+                any(tile in row for row in board) for tile in "#E"
+            )
+            if playable and np.array_equal(board, last_board):
+                same += 1
+            else:
+                same = 1 if playable else 0
+
+            if same >= polls:
+                return board
+
+            last_hash = canvas_hash
+            last_board = board
+            time.sleep(interval)
+
+        return None
+
     def unlock_all_levels(self):
         script = "window.localStorage.setItem('isNewPlayer','false')"
         self.driver.execute_script(script)
@@ -0,0 +1,43 @@
+import threading
+import time
+from typing import Callable, Optional
+
+
+class Budget:
+    # limits of one search, graph.Node and search.AStar check it once per
+    # node and stop with the best solution found so far when any limit is
+    # reached, searches without one pay nothing
+    def __init__(
+        self,
+        deadline: float = None,
+        nodes: int = None,
+        on_solution: Callable[[str], None] = None,
+        cancel: threading.Event = None,
+    ):
+        # seconds from now, nodes to expand, or set from another thread
+        self.deadline = None if deadline is None else time.perf_counter() + deadline
+        self.nodes = nodes
+        self.cancel = cancel
+
+        # called with every solution shorter than the ones before it
+        self.on_solution = on_solution
+        self.best: Optional[str] = None
+
+        self.expanded = 0
+        self.exhausted = False
+
+    def spent(self):
+        self.expanded += 1
+        if not self.exhausted:
+            self.exhausted = (
+                (self.nodes is not None and self.expanded > self.nodes)
+                or (self.deadline is not None and time.perf_counter() > self.deadline)
+                or (self.cancel is not None and self.cancel.is_set())
+            )
+        return self.exhausted
+
+    def found(self, movement: str):
+        if self.best is None or len(movement) < len(self.best):
+            self.best = movement
+            if self.on_solution is not None:
+                self.on_solution(movement)
@@ -1,41 +1,74 @@
 from typing import Dict, List, Tuple
 
+from bitboard import Level, State
+from budget import Budget
+import logs
+from logs import LOGGER
+from stats import Stats
+from transposition import TranspositionTable
 from utils import UP, DOWN, LEFT, RIGHT, a_star
 
-MEMO: Dict[str, str] = {}
+# bump when a change to the search can change the solutions it returns
+SOLVER_VERSION = 2
+
+# shortest solution length found by any worker when solving in parallel
+BOUND = None
+
+
+# bits of Cell.flags
+PATH = 1 << 0
+DIAMOND = 1 << 1
+KEY = 1 << 2
+DOOR = 1 << 3
+GATE = 1 << 4
+BUTTON = 1 << 5
+SPIKE = 1 << 6
+ROCK = 1 << 7
+HOLE = 1 << 8
+LAVA = 1 << 9
+EXIT = 1 << 10
+CLOSED = 1 << 11  # for A* search, not part of the cell state
+
+
+def flag(bit: int):
+    # bool attribute stored as one bit of flags
+    def get(self):
+        return self.flags & bit != 0
+
+    def set(self, value: bool):
+        if value:
+            self.flags |= bit
+        else:
+            self.flags &= ~bit
+
+    return property(get, set)
 
 
 class Cell:
+    __slots__ = ("x", "y", "total_rows", "total_cols", "flags", "neighbors")
+
+    closed = flag(CLOSED)
+    ispath = flag(PATH)  # whether the cell is a path or wall
+    isdiamond = flag(DIAMOND)
+    iskey = flag(KEY)
+    isdoor = flag(DOOR)
+    isgate = flag(GATE)
+    isbutton = flag(BUTTON)
+    isspike = flag(SPIKE)
+    isrock = flag(ROCK)
+    ishole = flag(HOLE)
+    islava = flag(LAVA)
+    isexit = flag(EXIT)
+
     def __init__(self, x: int, y: int, rows: int, cols: int):
         self.x = x
         self.y = y
 
         # For A* search
-        self.closed = False
         self.total_rows = rows
         self.total_cols = cols
 
-        # collectable items
-        self.isdiamond = False
-        self.iskey = False
-
-        # doors and gates
-        self.isdoor = False
-        self.isgate = False
-
-        # interactive cells
-        self.isbutton = False
-        self.isspike = False
-        self.isrock = False
-
-        # other
-        self.ishole = False
-        self.islava = False
-
-        self.ispath = False  # whether the cell is a path or wall
-
-        self.isexit = False
-
+        self.flags = 0
         self.neighbors: List[Cell] = []
 
     def get_pos(self):
@@ -156,35 +189,12 @@ class Cell:
                 self.neighbors.append(grid[self.x][self.y - 1])
 
     def to_string(self):
-        str = ""
-        str += "1" if self.ispath else "0"
-        str += "1" if self.isdiamond else "0"
-        str += "1" if self.iskey else "0"
-        str += "1" if self.isdoor else "0"
-        str += "1" if self.isgate else "0"
-        str += "1" if self.isbutton else "0"
-        str += "1" if self.isspike else "0"
-        str += "1" if self.isrock else "0"
-        str += "1" if self.ishole else "0"
-        str += "1" if self.islava else "0"
-        str += "1" if self.isexit else "0"
-
-        return str
+        # every flag but the A* one, equal cells give equal keys
+        return self.flags & ~CLOSED
 
     def copy(self):
         cell = Cell(self.x, self.y, self.total_rows, self.total_cols)
-        cell.closed = self.closed
-        cell.isdiamond = self.isdiamond
-        cell.iskey = self.iskey
-        cell.isdoor = self.isdoor
-        cell.isgate = self.isgate
-        cell.isbutton = self.isbutton
-        cell.isspike = self.isspike
-        cell.isrock = self.isrock
-        cell.ishole = self.ishole
-        cell.islava = self.islava
-        cell.ispath = self.ispath
-        cell.isexit = self.isexit
+        cell.flags = self.flags
         return cell
 
     def __lt__(self, _):
@@ -204,7 +214,7 @@ class Board:
         self.height = len(board)
 
     def __repr__(self):
-        return ".".join([cell.to_string() for row in self.grid for cell in row])
+        return ".".join([str(cell.to_string()) for row in self.grid for cell in row])
 
     def get_cell(self, pos: Tuple[int, int]):
         if pos[0] < 0 or pos[0] >= self.height or pos[1] < 0 or pos[1] >= self.width:
@@ -284,6 +294,8 @@ class Board:
 
 
 class Player:
+    __slots__ = ("pos", "has_key", "diamonds")
+
     def __init__(self, pos: Tuple[int, int], has_key: bool, diamonds: int):
         self.pos = pos
         self.has_key = has_key
@@ -304,7 +316,7 @@ class Player:
 class Node:
     def __init__(
         self,
-        board: List[List[Cell]],
+        board,
         start: Tuple[int, int],
         end: Tuple[int, int],
         has_key: bool = False,
@@ -313,318 +325,395 @@ class Node:
         max_path_length: int = 1000,
         logging: bool = True,
         optimal: bool = False,
-        interest_points: List[Tuple[int, int]] = [],
-        rocks: Dict[Tuple[int, int], Tuple[int, int]] = {},
-        rock_interest_points: List[Tuple[int, int]] = [],
-        rock_movement_memo: Dict[str, str] = {},
-        doors: List[Tuple[int, int]] = [],
+        rocks: Dict[int, int] = {},
+        rock_movement_memo: Dict[Tuple[int, str, int], str] = {},
+        level: Level = None,
+        length: int = 0,
+        history: int = 0,
+        parent: "Node" = None,
+        memo: TranspositionTable = None,
+        stats: Stats = None,
+        budget: Budget = None,
     ):
-        self.board = Board(board, depth == 0)
-        self.player = Player(
-            start,
-            has_key,
-            self.board.get_total_diamonds() if diamonds == -1 else diamonds,
-        )
-        self.end = end
+        if depth == 0:
+            grid = Board(board, True)
+            level = Level(grid.height, grid.width)
+            board = level.create(
+                grid.grid,
+                start,
+                has_key,
+                grid.get_total_diamonds() if diamonds == -1 else diamonds,
+            )
+            rocks = {rock: rock for rock in level.cells(board.rocks)}
+            rock_movement_memo = {}
+            memo = TranspositionTable()
+
+        self.level = level
+        self.state: State = board
+        self.end = level.index(end)
         self.depth = depth
         self.max_path_length = max_path_length
+        self.length = length  # moves made since the root
         self.movement = ""
-        self.logging = logging
+        # only log when a handler will get the records, see logs.setup
+        self.logging = logging and (depth > 0 or logs.enabled())
         self.optimal = optimal
 
-        if (
-            interest_points == []
-            or rocks == {}
-            or rock_interest_points == []
-            or doors == []
-        ):
-            result = self.get_all_interest_points()
-            if interest_points == []:
-                interest_points = result[0]
-            if rocks == {}:
-                rocks = result[1]
-            if rock_interest_points == []:
-                rock_interest_points = result[2]
-            if doors == []:
-                doors = result[3]
-
-        self.interest_points = interest_points
+        # shared with the parent and the children, every change made by move
+        # goes to the undo log so the parent can take it back with undo
         self.rocks = rocks
-        self.rock_interest_points = rock_interest_points
-        self.doors = doors
-
         self.rock_movement_memo = rock_movement_memo
+        self.undo_log: List[Tuple] = []
+        # hash of the rock pushes so far, they decide which pushes are left
+        self.history = history
 
-    def __repr__(self):
-        return str(self.board) + str(self.player)
+        # to rebuild the whole path of a solution found deep in the search
+        self.parent = parent
 
-    def print(self, message: str = "", type: str = "default"):
-        if not self.logging:
-            return
+        # belong to this search alone, other searches may run on other threads
+        self.memo = memo
+        # counters and limits of the search, None when nobody asked for them
+        self.stats = stats
+        self.budget = budget
 
-        colors = {
-            "info": "\033[94m",
-            "error": "\033[91m",
-            "success": "\033[92m",
-            "warning": "\033[93m",
-            "default": "\033[0m",
-        }
+    def __repr__(self):
+        return str(self.state)
 
-        print("> " * self.depth + colors[type] + message + "\033[0m")
+    def log(self, type: str, message: str, *args):
+        # the message is only formatted by the handlers that keep the record
+        if self.logging:
+            LOGGER.debug(message, *args, extra={"depth": self.depth, "kind": type})
 
     def move(self, path: str):
         self.movement = path
+        self.length += len(path)
+        self.state = self.level.walk(self.state, path)
 
-        for direction in self.movement:
-            self.player.move(direction)
-            self.board.update_state(self.player)
+        pos = self.state.pos
+        if not self.state.rocks & (1 << pos):
+            return None
 
-        cell = self.board.get_cell(self.player.pos)
-        if cell is None:
-            return
+        target = self.level.step(pos, self.movement[-1])
+        if target is None:
+            return None
 
-        if cell.isrock:
-            if self.movement[-1] == UP:
-                target = (cell.x - 1, cell.y)
-            elif self.movement[-1] == DOWN:
-                target = (cell.x + 1, cell.y)
-            elif self.movement[-1] == LEFT:
-                target = (cell.x, cell.y - 1)
-            elif self.movement[-1] == RIGHT:
-                target = (cell.x, cell.y + 1)
-            else:
-                target = (-1, -1)
-
-            target_cell = self.board.get_cell(target)
-            if target_cell is None:
-                return
-
-            if not (
-                (target_cell.x, target_cell.y) in self.rock_interest_points
-                or target_cell.ispath
-                or target_cell.islava
-            ):
-                print(f"Target {target} is not in rock interest points")
-                return
-
-            cell.isrock = False
-            if not cell.isspike:
-                cell.make_path()
-            # else:
-            #     print("Rock is on spike")
-            original_pos = self.rocks.pop((cell.x, cell.y))
-
-            rock_movement = str(
-                (
-                    (cell.x, cell.y),
-                    self.movement[-1],
-                    original_pos,
-                )
+        state = self.level.push(self.state, target)
+        if state is None:
+            self.log(
+                "warning",
+                "Target %s is not in rock interest points",
+                self.level.position(target),
             )
+            return None
 
-            if rock_movement in self.rock_movement_memo:
-                self.print("Rock movement is in memo", "error")
-                return False
-
-            if target_cell.ishole:
-                self.print(f"Filled hole at {target_cell}", "info")
-                target_cell.make_path()
-                target_cell.ishole = False
-                self.rock_interest_points.remove((target_cell.x, target_cell.y))
-                self.rock_movement_memo[rock_movement] = "FILL"
-            elif target_cell.islava:
-                self.print(f"Rock fell into lava at {target_cell}", "info")
-                self.rock_movement_memo[rock_movement] = "FALL"
-                pass
-            elif target_cell.isbutton:
-                self.print(f"Rock pressed button at {target_cell}", "info")
-                target_cell.make_wall()
-            elif target_cell.ispath:
-                self.print(f"Rock moved to {target_cell}", "info")
-                target_cell.make_rock()
-                self.rocks[(target_cell.x, target_cell.y)] = original_pos
-                self.rock_movement_memo[rock_movement] = "MOVE"
-            else:
-                self.print(f"Rock ??? at {target_cell}")
-
-            cell.update_neighbors(self.board.grid)
-            target_cell.update_neighbors(self.board.grid)
-
-            return target_cell
+        # the rock order decides the order of the moves, remember its place
+        index = list(self.rocks).index(pos)
+        original_pos = self.rocks.pop(pos)
+        self.undo_log.append(("rock", pos, original_pos, index))
+        rock_movement = (pos, self.movement[-1], original_pos)
+
+        if rock_movement in self.rock_movement_memo:
+            self.log("error", "Rock movement is in memo")
+            return False
+
+        self.history ^= hash((pos, original_pos))
+
+        bit = 1 << target
+        target_pos = self.level.position(target)
+        if self.state.holes & bit:
+            self.log("info", "Filled hole at %s", target_pos)
+            self.forget_rock(original_pos)
+            self.rock_movement_memo[rock_movement] = "FILL"
+            self.undo_log.append(("memo", rock_movement))
+        elif self.state.lava & bit:
+            self.log("info", "Rock fell into lava at %s", target_pos)
+            self.forget_rock(original_pos)
+            self.rock_movement_memo[rock_movement] = "FALL"
+            self.undo_log.append(("memo", rock_movement))
+        elif self.state.buttons & bit:
+            self.log("info", "Rock pressed button at %s", target_pos)
+            self.forget_rock(original_pos)
+        elif state.rocks & bit:
+            self.log("info", "Rock moved to %s", target_pos)
+            self.rocks[target] = original_pos
+            self.history ^= hash((target, original_pos)) ^ hash(rock_movement)
+            self.rock_movement_memo[rock_movement] = "MOVE"
+            self.undo_log.append(("placed", target))
+            self.undo_log.append(("memo", rock_movement))
+        else:
+            self.log("default", "Rock ??? at %s", target_pos)
 
-    def get_all_interest_points(self):
-        interest_points: List[Tuple[int, int]] = []
-        rocks: Dict[Tuple[int, int], List[Tuple[int, int]]] = {}
-        rock_interest_points: List[Tuple[int, int]] = []
-        doors: List[Tuple[int, int]] = []
+        self.state = state
 
-        for i, row in enumerate(self.board.grid):
-            for j, cell in enumerate(row):
-                if cell.isdiamond or cell.iskey or cell.isexit or cell.isgate:
-                    interest_points.append((i, j))
-                if cell.isrock:
-                    rocks[(i, j)] = (i, j)
-                if cell.ishole:
-                    rock_interest_points.append((i, j))
-                if cell.isdoor:
-                    doors.append((i, j))
+        return target
 
-        return interest_points, rocks, rock_interest_points, doors
+    def undo(self):
+        for change in reversed(self.undo_log):
+            if change[0] == "memo":
+                del self.rock_movement_memo[change[1]]
+            elif change[0] == "placed":
+                del self.rocks[change[1]]
+            else:
+                _, pos, original_pos, index = change
+                rocks = list(self.rocks.items())
+                rocks.insert(index, (pos, original_pos))
+                self.rocks.clear()
+                self.rocks.update(rocks)
+        self.undo_log.clear()
+
+    def forget_rock(self, original_pos: int):
+        # pushes of a rock that is gone can't be repeated, so they no longer
+        # tell apart states in the memo
+        for rock_movement in self.rock_movement_memo:
+            if rock_movement[2] == original_pos:
+                self.history ^= hash(rock_movement)
 
     def get_interest_points(self):
-        interest_points: List[str] = []
-
-        for x, y in self.interest_points:
-            path = self.board.get_path(self.player, (x, y))
-            cell = self.board.get_cell((x, y))
-
-            if path is None or path == "" or cell is None:
-                continue
-
-            is_exit = self.player.diamonds == 0 and cell.isexit
-            is_key = not self.player.has_key and cell.iskey
-            is_gate = self.player.has_key and cell.isgate
-            is_diamond = cell.isdiamond
-
-            if is_exit or is_key or is_gate or is_diamond:
-                interest_points.append(path)
-
-        for x, y in self.rocks.keys():
-            rock = self.board.get_cell((x, y))
-            if rock is None:
-                continue
-
-            for neighbor in rock.neighbors:
-                post_move = ""
-                if rock.x + 1 == neighbor.x:
-                    opposite_pos = (rock.x - 1, rock.y)
-                    post_move = UP
-                elif rock.x - 1 == neighbor.x:
-                    opposite_pos = (rock.x + 1, rock.y)
-                    post_move = DOWN
-                elif rock.y + 1 == neighbor.y:
-                    opposite_pos = (rock.x, rock.y - 1)
-                    post_move = LEFT
-                elif rock.y - 1 == neighbor.y:
-                    opposite_pos = (rock.x, rock.y + 1)
-                    post_move = RIGHT
-                else:
-                    opposite_pos = (-1, -1)
-
-                opposite_cell = self.board.get_cell(opposite_pos)
-                if opposite_cell is not None and (
-                    opposite_cell.ispath or opposite_cell.ishole or opposite_cell.islava
-                ):
-                    path = self.board.get_path(self.player, (neighbor.x, neighbor.y))
-                    if path is None:
-                        continue
-                    path += post_move
-                    interest_points.append(path)
-
-        interest_points.sort(key=lambda x: len(x))
-
-        interest_points_final: List[str] = []
-        for path in interest_points:
-            for path2 in interest_points:
-                if path == path2:
-                    continue
+        # paths are only built from the search tree when a move is explored
+        state = self.state
+        if self.stats is not None:
+            self.stats.path_searches += 1
+            start = self.stats.start()
+            tree = self.level.explore(state)
+            self.stats.stop("explore", start)
+        else:
+            tree = self.level.explore(state)
+        interest_points = self.level.moves(state, tree, self.rocks)
 
-                if path.startswith(path2):
-                    break
-            else:
-                interest_points_final.append(path)
+        max_path_length = self.get_max_path_length()
 
         def shorter_than_max(x):
-            return len(x) <= self.max_path_length
+            return x[0] <= max_path_length
+
+        moves = list(filter(shorter_than_max, interest_points))
+        if self.stats is not None:
+            self.stats.pruned += len(interest_points) - len(moves)
+        return tree, moves
+
+    def get_max_path_length(self):
+        if BOUND is None:
+            return self.max_path_length
+        return min(self.max_path_length, BOUND.value - self.length)
+
+    def child(self, path: str):
+        return Node(
+            self.state,
+            self.level.position(self.state.pos),
+            self.level.position(self.end),
+            depth=self.depth + 1,
+            max_path_length=self.max_path_length - len(path),
+            logging=self.logging,
+            optimal=self.optimal,
+            rocks=self.rocks,
+            rock_movement_memo=self.rock_movement_memo,
+            level=self.level,
+            length=self.length,
+            history=self.history,
+            parent=self,
+            memo=self.memo,
+            stats=self.stats,
+            budget=self.budget,
+        )
 
-        return list(filter(shorter_than_max, interest_points_final))
+    def path_from_root(self):
+        paths = []
+        node = self
+        while node is not None:
+            paths.append(node.movement)
+            node = node.parent
+        return "".join(reversed(paths))
 
     def solve(self, path=""):
         res = None
         if path != "":
-            res = self.move(path)
-            if res == False:
+            if self.stats is not None:
+                start = self.stats.start()
+                res = self.move(path)
+                self.stats.stop("move", start)
+            else:
+                res = self.move(path)
+            if res is False:
+                if self.stats is not None:
+                    self.stats.pruned += 1
                 return False
-            self.print(f"Moved to {self.player.pos} with path {self.movement}")
+            self.log(
+                "default",
+                "Moved to %s with path %s",
+                self.level.position(self.state.pos),
+                self.movement,
+            )
         else:
-            self.print(f"Starting at {self.player.pos}")
+            self.log("default", "Starting at %s", self.level.position(self.state.pos))
+        if self.stats is not None:
+            self.stats.nodes += 1
+            self.stats.max_depth = max(self.stats.max_depth, self.depth)
 
-        if self.player.pos == self.end:
+        if self.state.pos == self.end:
             return True
 
-        self.interest_points = list(
-            filter(lambda x: x != self.player.pos, self.interest_points)
-        )
+        if self.budget is not None and self.budget.spent():
+            return False
 
-        memo_key = str(self)
+        # an entry is only reused when searching again would give the same
+        # result: a failure within a larger bound or a path within this one
+        memo_key = self.state.zobrist ^ self.history
+        entry = self.memo.get(memo_key)
 
-        if memo_key in MEMO:
-            movement = MEMO[memo_key]
+        if entry is not None:
+            movement, bound = entry
+            max_path_length = self.get_max_path_length()
 
-            if movement == "":
-                self.print("Player failed to reach the end (memo)", "error")
+            if movement == "" and bound >= max_path_length:
+                if self.stats is not None:
+                    self.stats.memo_hits += 1
+                self.log("error", "Player failed to reach the end (memo)")
                 return False
 
-            self.print(f"Reach end with path {movement} (memo)", "success")
-            self.movement += movement
-            return True
+            if movement != "" and len(movement) <= max_path_length:
+                if self.stats is not None:
+                    self.stats.memo_hits += 1
+                self.log("success", "Reach end with path %s (memo)", movement)
+                self.movement += movement
+                return True
+
+        if self.stats is not None:
+            self.stats.memo_misses += 1
 
         result = ""
 
-        doors = [None] if res is None or not res.isbutton else self.doors
+        state = self.state
+        pressed = res is not None and state.buttons & (1 << res)
+        doors = list(self.level.cells(state.doors)) if pressed else [None]
 
         for door in doors:
             if door is not None:
-                d = self.board.get_cell(door)
-                self.print(f"Opening door at {door}", "info")
-                d.make_open_door()
-
-            interest_points = self.get_interest_points()
-
-            self.print(f"Interest points: {interest_points}", "success")
-            self.print(f"Rocks: {self.rocks}", "success")
-
-            for path in interest_points:
-
-                new_node = Node(
-                    self.board.copy(),
-                    self.player.pos,
-                    self.end,
-                    self.player.has_key,
-                    self.player.diamonds,
-                    self.depth + 1,
-                    self.max_path_length - len(path),
-                    self.logging,
-                    self.optimal,
-                    self.interest_points.copy(),
-                    self.rocks.copy(),
-                    self.rock_interest_points.copy(),
-                    self.rock_movement_memo.copy(),
-                    self.doors.copy(),
-                )
-
-                if new_node.solve(path):
+                self.log("info", "Opening door at %s", self.level.position(door))
+                self.state = self.level.open_door(state, door)
+
+            tree, interest_points = self.get_interest_points()
+
+            if self.logging:
+                targets = [
+                    f"{self.level.position(end)}{push}"
+                    for _, end, push in interest_points
+                ]
+                rocks = {
+                    self.level.position(rock): self.level.position(original)
+                    for rock, original in self.rocks.items()
+                }
+                self.log("success", "Interest points: %s", targets)
+                self.log("success", "Rocks: %s", rocks)
+
+            for _, end, push in interest_points:
+                path = self.level.get_path(tree, end) + push
+
+                new_node = self.child(path)
+                solved = new_node.solve(path)
+                new_node.undo()
+
+                if solved:
                     if len(result) == 0 or len(new_node.movement) < len(result):
                         result = new_node.movement
                         self.max_path_length = min(self.max_path_length, len(result))
-                        new_node.print(f"Exit found with path {result}", "success")
+                        if BOUND is not None and self.optimal:
+                            share_bound(self.length + len(result))
+                        new_node.log("success", "Exit found with path %s", result)
+                        if self.budget is not None:
+                            self.budget.found(self.path_from_root() + result)
                         if not self.optimal:
                             break
                     else:
-                        new_node.print(
-                            f"Exit found with path {result} (not optimal)", "warning"
+                        new_node.log(
+                            "warning", "Exit found with path %s (not optimal)", result
                         )
 
+                if self.budget is not None and self.budget.exhausted:
+                    break
+
             if door is not None:
-                d = self.board.get_cell(door)
-                self.print(f"Closing door at {door}", "info")
-                d.make_closed_door()
+                self.log("info", "Closing door at %s", self.level.position(door))
+                self.state = state
+
+        # a search cut short by the budget proves nothing about this state
+        if self.budget is None or not self.budget.exhausted:
+            self.memo.put(memo_key, result, self.get_max_path_length())
+
+        if result != "":
+            self.movement += result
+            return True
+
+        self.log("error", "Player failed to reach the end")
+        return False
+
+    def solve_parallel(self, workers: int):
+        # each root move is solved in its own process, the result is the one
+        # the serial search keeps: the shortest, and the first one on ties
+        self.log("default", "Starting at %s", self.level.position(self.state.pos))
+
+        if self.state.pos == self.end:
+            return True
+
+        tree, interest_points = self.get_interest_points()
+        paths = [
+            self.level.get_path(tree, end) + push for _, end, push in interest_points
+        ]
+
+        # only parallel solves need the process machinery
+        from concurrent.futures import ProcessPoolExecutor
+        from multiprocessing import Value
+
+        bound = Value("i", self.max_path_length)
+        result = ""
+
+        with ProcessPoolExecutor(
+            workers, initializer=init_worker, initargs=(bound,)
+        ) as executor:
+            futures = [
+                executor.submit(solve_subtree, self.child(path), path) for path in paths
+            ]
+
+            for future in futures:
+                movement, stats = future.result()
+                if self.stats is not None:
+                    self.stats.merge(stats)
+                if movement == "":
+                    continue
 
-        MEMO[memo_key] = result
+                if len(result) == 0 or len(movement) < len(result):
+                    result = movement
+
+                if not self.optimal:
+                    # later moves can't change the result, stop their workers
+                    bound.value = -1
+                    for pending in futures:
+                        pending.cancel()
+                    break
 
         if result != "":
             self.movement += result
             return True
 
-        self.print("Player failed to reach the end", "error")
+        self.log("error", "Player failed to reach the end")
         return False
+
+
+def init_worker(bound):
+    global BOUND
+    BOUND = bound
+
+
+def share_bound(length: int):
+    with BOUND.get_lock():
+        if length < BOUND.value:
+            BOUND.value = length
+
+
+def solve_subtree(node: Node, path: str):
+    # returns the stats of this subtree alone, workers solve many of them
+    node.memo = TranspositionTable()
+    if node.stats is not None:
+        node.stats = Stats(node.stats.timers is not None)
+
+    if node.solve(path):
+        return node.movement, node.stats
+    return "", node.stats
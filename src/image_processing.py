@@ -1,4 +1,6 @@
 import os
+import tempfile
+import zipfile
 
 from cv2 import cv2 as cv
 import numpy as np
@@ -6,6 +8,10 @@ import numpy as np
 import image_processing as img_proc
 
 
+# the board inside a canvas screenshot, as crop_img arguments
+BOARD_CROP = {"cols": 10, "rows": 15, "top": 2, "bottom": 1, "left": 1, "right": 1}
+
+
 def get_image(name):
     name = os.path.join(os.path.dirname(__file__), "..", "images", name)
     return cv.imread(name)
@@ -29,20 +35,23 @@ def crop_img(image, cols, rows, top=0, bottom=0, left=0, right=0):
     return image
 
 
-def get_tiles(image, cols, rows):
+def get_regions(image, cols, rows):
     height, width = image.shape[:2]
     tile_width = width / cols
     tile_height = height / rows
-    tiles = []
+    regions = []
     for i in range(rows):
         for j in range(cols):
-            tile = image[
+            region = image[
                 int(i * tile_height) : int((i + 1) * tile_height),
                 int(j * tile_width) : int((j + 1) * tile_width),
             ]
-            tile = cv.resize(tile, (64, 64))
-            tiles.append(tile)
-    return tiles
+            regions.append(region)
+    return regions
+
+
+def get_tiles(image, cols, rows):
+    return [cv.resize(region, (64, 64)) for region in get_regions(image, cols, rows)]
 
 
 def compare_tiles(tile1, tile2):
@@ -57,27 +66,122 @@ def compare_tiles(tile1, tile2):
     return max_val
 
 
-def compare_all_tiles(tiles_a, tiles_b, error_margin=0.9, default_value=-1):
-    results = []
-    for i, tile_a in enumerate(tiles_a):
-        max_val, max_index = 0, 0
-        if i < 8:
-            tile_a = crop_img(tile_a, 1, 2, top=1)
+def normalize_tiles(tiles):
+    # grayscale tiles as rows with zero mean and unit norm, so the dot product
+    # of two rows is the TM_CCOEFF_NORMED score of the two tiles
+    gray = np.stack([cv.cvtColor(tile, cv.COLOR_BGR2GRAY) for tile in tiles])
+    gray = gray.reshape(len(tiles), -1).astype(np.float64)
+    gray -= gray.mean(axis=1, keepdims=True)
+
+    norms = np.linalg.norm(gray, axis=1, keepdims=True)
+    # constant tiles score 0 against everything, like in OpenCV
+    norms[norms == 0] = np.inf
+
+    return gray / norms
+
+
+def get_halves(tiles):
+    return [crop_img(tile, 1, 2, top=1) for tile in tiles]
+
 
-        for j, tile_b in enumerate(tiles_b):
-            if i < 8:
-                tile_b = crop_img(tile_b, 1, 2, top=1)
+class Templates:
+    # tileset tiles with everything the comparison needs precomputed
+    def __init__(self, tiles, normalized=None, halves=None):
+        self.tiles = tiles
+        self.normalized = normalize_tiles(tiles) if normalized is None else normalized
+        self.halves = normalize_tiles(get_halves(tiles)) if halves is None else halves
 
-            val = compare_tiles(tile_a, tile_b)
 
-            if val > max_val and val != 1:
-                max_val = val
-                max_index = j
-        if max_val < error_margin:
-            max_index = default_value
+TEMPLATES = None
+TEMPLATES_CACHE = os.path.join(os.path.dirname(__file__), "..", "images", "tileset.npz")
+# bump when the templates are computed differently, old caches are made again
+TEMPLATES_FORMAT = 1
 
-        results.append(max_index)
-    return np.array(results)
+
+def load_templates():
+    tileset_path = os.path.join(
+        os.path.dirname(__file__), "..", "images", "tileset.png"
+    )
+    mtime = os.stat(tileset_path).st_mtime_ns
+
+    # the cache is only valid for the tileset and the format it was made
+    # with, a cache that can't be read is made again
+    try:
+        with np.load(TEMPLATES_CACHE) as cache:
+            if cache["mtime"] == mtime and cache["format"] == TEMPLATES_FORMAT:
+                return Templates(
+                    list(cache["tiles"]), cache["normalized"], cache["halves"]
+                )
+    except (OSError, EOFError, KeyError, ValueError, zipfile.BadZipFile):
+        pass
+
+    tileset = img_proc.get_image("tileset.png")
+    templates = Templates(img_proc.get_tiles(tileset, 8, 8)[:-2])
+
+    # written aside and moved over the cache, so other processes never read
+    # half a file
+    try:
+        fd, path = tempfile.mkstemp(
+            ".npz", "tileset.", os.path.dirname(TEMPLATES_CACHE)
+        )
+    except OSError:
+        return templates
+
+    try:
+        with os.fdopen(fd, "wb") as file:
+            np.savez(
+                file,
+                mtime=mtime,
+                format=TEMPLATES_FORMAT,
+                tiles=np.stack(templates.tiles),
+                normalized=templates.normalized,
+                halves=templates.halves,
+            )
+        os.replace(path, TEMPLATES_CACHE)
+    except OSError:
+        os.remove(path)
+
+    return templates
+
+
+def get_templates():
+    global TEMPLATES
+    if TEMPLATES is None:
+        TEMPLATES = load_templates()
+    return TEMPLATES
+
+
+def classify_tiles(tiles, templates, error_margin=0.9, default_value=-1, top=8):
+    scores = normalize_tiles(tiles) @ templates.normalized.T
+
+    # the first row (the first `top` tiles) is only compared by the bottom half
+    top = min(len(tiles), top)
+    if top > 0:
+        scores[:top] = normalize_tiles(get_halves(tiles[:top])) @ templates.halves.T
+
+    # OpenCV scores are float32, exact matches (1) are skipped
+    scores = np.clip(scores, -1, 1).astype(np.float32)
+
+    # matchTemplate often gives 0.9999998 where the product rounds to 1, so
+    # those pairs are scored by OpenCV itself before skipping
+    for i, j in zip(*np.nonzero(scores == 1)):
+        tile, template = tiles[i], templates.tiles[j]
+        if i < top:
+            tile, template = get_halves([tile, template])
+        scores[i, j] = compare_tiles(tile, template)
+    scores[scores == 1] = 0
+
+    results = scores.argmax(axis=1)
+    max_vals = scores[np.arange(len(results)), results]
+
+    results[max_vals <= 0] = 0
+    results[max_vals < error_margin] = default_value
+
+    return results
+
+
+def compare_all_tiles(tiles_a, tiles_b, error_margin=0.9, default_value=-1):
+    return classify_tiles(tiles_a, Templates(tiles_b), error_margin, default_value)
 
 
 def board_to_processable_array(board):
@@ -147,8 +251,7 @@ def board_to_processable_array(board):
 
 
 def recreate_board(types, cols, rows):
-    tileset = img_proc.get_image("tileset.png")
-    tiles = img_proc.get_tiles(tileset, 8, 8)[:-2]
+    tiles = img_proc.get_templates().tiles
 
     tile_width, tile_height = tiles[0].shape[:2]
     result = np.zeros((rows * tile_height, cols * tile_width, 3), np.uint8)
@@ -185,16 +288,48 @@ def recreate_board(types, cols, rows):
     return result
 
 
-def process_board(board):
-    board = img_proc.crop_img(board, 10, 15, top=2, bottom=1, left=1, right=1)
-
-    tileset = img_proc.get_image("tileset.png")
+def process_board(board, cropped=False):
+    if not cropped:
+        board = img_proc.crop_img(board, **BOARD_CROP)
 
     board_tiles = img_proc.get_tiles(board, 8, 12)
-    tileset_tiles = img_proc.get_tiles(tileset, 8, 8)[:-2]
 
-    result = img_proc.compare_all_tiles(board_tiles, tileset_tiles, 0.5, 13)
+    result = img_proc.classify_tiles(board_tiles, img_proc.get_templates(), 0.5, 13)
 
     result = board_to_processable_array(result.reshape(12, 8))
 
     return result
+
+
+class BoardRecognizer:
+    # remembers the last frame and only classifies the tiles that changed
+    def __init__(self, cols=8, rows=12):
+        self.cols = cols
+        self.rows = rows
+        self.hashes = None
+        self.labels = None
+        self.changed = 0
+
+    def process_board(self, board, cropped=False):
+        if not cropped:
+            board = img_proc.crop_img(board, **BOARD_CROP)
+        regions = img_proc.get_regions(board, self.cols, self.rows)
+        hashes = [hash(region.tobytes()) for region in regions]
+
+        if self.hashes is None or len(self.hashes) != len(hashes):
+            changed = list(range(len(regions)))
+            self.labels = np.zeros(len(regions), dtype=np.int64)
+        else:
+            changed = [i for i, h in enumerate(hashes) if h != self.hashes[i]]
+
+        if changed:
+            tiles = [cv.resize(regions[i], (64, 64)) for i in changed]
+            top = sum(1 for i in changed if i < self.cols)
+            self.labels[changed] = img_proc.classify_tiles(
+                tiles, img_proc.get_templates(), 0.5, 13, top
+            )
+
+        self.hashes = hashes
+        self.changed = len(changed)
+
+        return board_to_processable_array(self.labels.reshape(self.rows, self.cols))
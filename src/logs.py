@@ -0,0 +1,63 @@
+import logging
+
+LOGGER = logging.getLogger("solver")
+
+COLORS = {
+    "info": "\033[94m",
+    "error": "\033[91m",
+    "success": "\033[92m",
+    "warning": "\033[93m",
+    "default": "\033[0m",
+}
+
+
+class DepthFilter(logging.Filter):
+    # drops the records of nodes deeper than max_depth
+    def __init__(self, max_depth: int = None):
+        super().__init__()
+        self.max_depth = max_depth
+
+    def filter(self, record):
+        depth = getattr(record, "depth", 0)
+        return self.max_depth is None or depth <= self.max_depth
+
+
+class ConsoleFormatter(logging.Formatter):
+    def format(self, record):
+        depth = getattr(record, "depth", 0)
+        color = COLORS[getattr(record, "kind", "default")]
+        return "> " * depth + color + record.getMessage() + "\033[0m"
+
+
+class TraceFormatter(logging.Formatter):
+    # one line per record: depth, kind and message separated by tabs
+    def format(self, record):
+        depth = getattr(record, "depth", 0)
+        kind = getattr(record, "kind", "default")
+        return f"{depth}\t{kind}\t{record.getMessage()}"
+
+
+def setup(console=True, max_depth: int = None, trace: str = None):
+    for handler in list(LOGGER.handlers):
+        LOGGER.removeHandler(handler)
+        handler.close()
+
+    LOGGER.setLevel(logging.DEBUG)
+    LOGGER.propagate = False
+
+    if console:
+        handler = logging.StreamHandler()
+        handler.setFormatter(ConsoleFormatter())
+        handler.addFilter(DepthFilter(max_depth))
+        LOGGER.addHandler(handler)
+
+    if trace is not None:
+        handler = logging.FileHandler(trace, "a")
+        handler.setFormatter(TraceFormatter())
+        handler.addFilter(DepthFilter(max_depth))
+        LOGGER.addHandler(handler)
+
+
+def enabled():
+    # the solver only logs when a handler was set up
+    return LOGGER.hasHandlers() and LOGGER.isEnabledFor(logging.DEBUG)
@@ -1,21 +1,87 @@
+import os
 import sys
 import time
 
 import ai
-import image_processing as img_proc
-from browser import Browser
+import logs
+from bitboard import MOVEMENTS
 
+# opencv and selenium are only imported once a board has to be seen or played
 
-def start_game(browser, logging=True, optimal=False, show_image=False):
-    board = browser.get_board()
-    result = img_proc.process_board(board)
+# keeps the last board so repeated captures only reclassify changed tiles
+recognizer = None
+
+
+def get_recognizer():
+    global recognizer
+    if recognizer is None:
+        import image_processing as img_proc
+
+        recognizer = img_proc.BoardRecognizer()
+    return recognizer
+
+
+def find_player(board):
+    for i, row in enumerate(board):
+        for j, tile in enumerate(row):
+            if tile == "#":
+                return i, j
+    return None
+
+
+def follow_player(browser, board):
+    # checks after every move that the player is seen where it should be
+    import image_processing as img_proc
+
+    expected = find_player(board)
+
+    def verify(index, move):
+        nonlocal expected
+        expected = (
+            expected[0] + MOVEMENTS[move][0],
+            expected[1] + MOVEMENTS[move][1],
+        )
+
+        board = browser.get_board(img_proc.BOARD_CROP)
+        found = find_player(get_recognizer().process_board(board, cropped=True))
+        if found != expected:
+            print(f"Move {index + 1}: player expected at {expected}, found at {found}")
+            return False
+        return True
+
+    return verify
+
+
+def start_game(
+    browser,
+    logging=True,
+    optimal=False,
+    show_image=False,
+    workers=0,
+    closed_loop=False,
+    engine="dfs",
+):
+    import image_processing as img_proc
+
+    # the level may still be loading after select_level or unlock_all_levels
+    result = browser.wait_until_ready(recognizer=get_recognizer())
+    if result is None:
+        print("The level didn't look ready in time, capturing it anyway")
+        board = browser.get_board(img_proc.BOARD_CROP)
+        result = get_recognizer().process_board(board, cropped=True)
 
     if show_image:
         recreated = img_proc.recreate_board(result, 8, 12)
         img_proc.show_image(recreated)
 
     start_time = time.perf_counter()
-    movement = ai.get_movement_from_array(result, logging=logging, optimal=optimal)
+    movement = ai.get_movement_from_array(
+        result,
+        logging=logs.enabled(),
+        optimal=optimal,
+        workers=workers,
+        engine=engine,
+    )
     end_time = time.perf_counter()
 
     hours = int((end_time - start_time) // 3600)
@@ -31,24 +97,44 @@ def start_game(browser, logging=True, optimal=False, show_image=False):
     else:
         print(f"No path found in {hours}:{minutes}:{seconds}.{milliseconds}")
 
-    browser.move(movement)
+    verify = follow_player(browser, result) if closed_loop else None
+    if not browser.move(movement, verify=verify):
+        print("Stopped playing, the board doesn't match the solution")
 
 
 def help():
     print("'no-logs' to disable logs")
     print("'optimal' to find optimal solution")
     print("'show-image' to show recreated board")
+    print("'astar' to use the best first search engine")
+    print("'parallel' to search on all CPU cores")
+    print("'closed-loop' to check the board after every move")
+    print("'measure-capture' to time both ways of capturing the board")
     print("'exit' to close")
     print("'help' to show this message")
 
 
-def main(lvl, logging=True, optimal=False, show_image=False):
-    browser = Browser()
-    time.sleep(1)
+def main(
+    lvl,
+    logging=True,
+    optimal=False,
+    show_image=False,
+    workers=0,
+    closed_loop=False,
+    capture="screenshot",
+    log_depth=None,
+    trace=None,
+    engine="dfs",
+):
+    # the console shows the search unless no-logs, the trace file always does
+    logs.setup(logging, log_depth, trace)
+
+    from browser import Browser
+
+    browser = Browser(capture=capture)
     if lvl is not None:
         browser.select_level(lvl)
-        time.sleep(3)
-        start_game(browser, logging, optimal, show_image)
+        start_game(browser, logging, optimal, show_image, workers, closed_loop, engine)
     else:
         browser.unlock_all_levels()
         help()
@@ -62,11 +148,22 @@ def main(lvl, logging=True, optimal=False, show_image=False):
                 help()
                 continue
 
+            if "measure-capture" in user_input:
+                for capture, seconds in browser.measure_capture().items():
+                    print(f"{capture}: {seconds * 1000:.1f} ms")
+                continue
+
             logging = "no-logs" not in user_input
+            logs.setup(logging, log_depth, trace)
             optimal = "optimal" in user_input
             show_image = "show-image" in user_input
+            workers = os.cpu_count() if "parallel" in user_input else 0
+            closed_loop = "closed-loop" in user_input
+            engine = "astar" if "astar" in user_input else "dfs"
 
-            start_game(browser, logging, optimal, show_image)
+            start_game(
+                browser, logging, optimal, show_image, workers, closed_loop, engine
+            )
 
     browser.close()
 
@@ -84,4 +181,10 @@ if __name__ == "__main__":
         "--no-logs" not in args,
         "--optimal" in args,
         "--show-image" in args,
+        os.cpu_count() if "--parallel" in args else 0,
+        "--closed-loop" in args,
+        "pixels" if "--pixel-capture" in args else "screenshot",
+        next((int(arg[12:]) for arg in args if arg.startswith("--log-depth=")), None),
+        next((arg[8:] for arg in args if arg.startswith("--trace=")), None),
+        "astar" if "--astar" in args else "dfs",
     )
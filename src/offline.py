@@ -0,0 +1,101 @@
+import json
+import os
+import sys
+import time
+from typing import List
+
+import ai
+
+ROWS = 12
+COLS = 8
+TILES = set("WPDECOHKLGBSR#")
+
+
+def parse_board(text: str):
+    text = text.strip()
+
+    # json files hold either the rows or {"board": rows}, rows being strings
+    # or lists of characters
+    if text.startswith("[") or text.startswith("{"):
+        board = json.loads(text)
+        if isinstance(board, dict):
+            board = board["board"]
+    else:
+        board = text.splitlines()
+
+    board = [list(row.strip()) if isinstance(row, str) else row for row in board]
+    board = [row for row in board if row]
+
+    if len(board) != ROWS or any(len(row) != COLS for row in board):
+        raise ValueError(f"Board must be {ROWS}x{COLS} tiles")
+
+    unknown = {tile for row in board for tile in row} - TILES
+    if unknown:
+        raise ValueError(f"Unknown tiles {''.join(sorted(unknown))}")
+
+    return board
+
+
+def load_board(path: str):
+    if path.lower().endswith(".png"):
+        # only screenshots need opencv
+        import image_processing as img_proc
+
+        return img_proc.process_board(img_proc.cv.imread(path))
+
+    with open(path) as file:
+        return parse_board(file.read())
+
+
+def find_levels(paths: List[str]):
+    levels = []
+    for path in paths:
+        if os.path.isdir(path):
+            for name in sorted(os.listdir(path)):
+                if name.lower().endswith((".txt", ".json", ".png")):
+                    levels.append(os.path.join(path, name))
+        else:
+            levels.append(path)
+    return levels
+
+
+def solve_levels(paths: List[str], logging=False, optimal=False, cache=True):
+    results = {}
+    for path in find_levels(paths):
+        try:
+            board = load_board(path)
+        except (OSError, ValueError, KeyError) as error:
+            print(f"{path}: {error}")
+            continue
+
+        start_time = time.perf_counter()
+        movement = ai.get_movement_from_array(
+            board, logging=logging, optimal=optimal, cache=cache
+        )
+        end_time = time.perf_counter()
+
+        if movement != "":
+            print(f"{path}: {movement} ({len(movement)} moves)", end="")
+        else:
+            print(f"{path}: no path found", end="")
+        print(f" in {int((end_time - start_time) * 1000)} ms")
+
+        results[path] = movement
+    return results
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    paths = [arg for arg in args if not arg.startswith("--")]
+
+    if not paths:
+        print("Usage: python src/offline.py [--logs] [--optimal] [--no-cache]")
+        print("       <level.txt | level.json | screenshot.png | directory>...")
+        sys.exit(1)
+
+    solve_levels(
+        paths,
+        "--logs" in args,
+        "--optimal" in args,
+        "--no-cache" not in args,
+    )
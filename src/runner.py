@@ -0,0 +1,159 @@
+import asyncio
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from functools import partial
+from typing import Dict, List
+
+import ai
+
+# seconds a level gets to load after select_level
+READY_TIMEOUT = 10
+
+
+def capture_level(browser, recognizer, level: int):
+    # runs on the scout's thread, selenium drivers can't be shared by threads
+    import image_processing as img_proc
+
+    browser.select_level(level)
+    board = browser.wait_until_ready(READY_TIMEOUT, recognizer=recognizer)
+    if board is None:
+        print(f"Level {level} didn't look ready in time, capturing it anyway")
+        board = browser.get_board(img_proc.BOARD_CROP)
+        board = recognizer.process_board(board, cropped=True)
+    return board
+
+
+def play_level(browser, level: int, movement: str):
+    browser.select_level(level)
+    if browser.wait_until_ready(READY_TIMEOUT) is None:
+        print(f"Level {level} didn't look ready in time, playing it anyway")
+    return browser.move(movement)
+
+
+class Runner:
+    # plays a list of levels with two browsers: the scout loads and captures
+    # the next levels while the player plays the current one, and the solves
+    # run in another process, bounded queues keep every stage one level ahead
+    def __init__(self, optimal=False, engine="dfs", capture="screenshot", ahead=1):
+        self.optimal = optimal
+        self.engine = engine
+        self.capture = capture
+        self.ahead = ahead
+
+        # level -> seconds spent in each stage
+        self.timings: Dict[int, Dict[str, float]] = {}
+
+    async def timed(self, level: int, stage: str, executor, function, *args):
+        start = time.perf_counter()
+        result = await asyncio.get_running_loop().run_in_executor(
+            executor, function, *args
+        )
+        self.timings.setdefault(level, {})[stage] = time.perf_counter() - start
+        return result
+
+    async def scout(self, levels: List[int], browser, recognizer, boards, executor):
+        for level in levels:
+            board = await self.timed(
+                level, "capture", executor, capture_level, browser, recognizer, level
+            )
+            await boards.put((level, board))
+        await boards.put(None)
+
+    async def solve(self, boards, movements, executor):
+        solve = partial(
+            ai.get_movement_from_array,
+            logging=False,
+            optimal=self.optimal,
+            engine=self.engine,
+        )
+
+        while True:
+            item = await boards.get()
+            if item is None:
+                break
+
+            level, board = item
+            movement = await self.timed(level, "solve", executor, solve, board)
+            await movements.put((level, movement))
+        await movements.put(None)
+
+    async def play(self, browser, movements, executor):
+        results = {}
+        while True:
+            item = await movements.get()
+            if item is None:
+                break
+
+            level, movement = item
+            if movement == "":
+                print(f"Level {level}: no path found")
+                results[level] = False
+                continue
+
+            played = await self.timed(
+                level, "play", executor, play_level, browser, level, movement
+            )
+            print(f"Level {level}: played {len(movement)} moves")
+            results[level] = played
+        return results
+
+    async def run(self, levels: List[int]):
+        from browser import Browser
+        import image_processing as img_proc
+
+        scout_thread = ThreadPoolExecutor(1)
+        player_thread = ThreadPoolExecutor(1)
+        loop = asyncio.get_running_loop()
+
+        scout, player = await asyncio.gather(
+            loop.run_in_executor(scout_thread, partial(Browser, capture=self.capture)),
+            loop.run_in_executor(player_thread, Browser),
+        )
+        await asyncio.gather(
+            loop.run_in_executor(scout_thread, scout.unlock_all_levels),
+            loop.run_in_executor(player_thread, player.unlock_all_levels),
+        )
+
+        boards = asyncio.Queue(self.ahead)
+        movements = asyncio.Queue(self.ahead)
+        try:
+            with ProcessPoolExecutor(1) as solver:
+                _, _, results = await asyncio.gather(
+                    self.scout(
+                        levels, scout, img_proc.BoardRecognizer(), boards, scout_thread
+                    ),
+                    self.solve(boards, movements, solver),
+                    self.play(player, movements, player_thread),
+                )
+        finally:
+            await asyncio.gather(
+                loop.run_in_executor(scout_thread, scout.close),
+                loop.run_in_executor(player_thread, player.close),
+            )
+            scout_thread.shutdown()
+            player_thread.shutdown()
+
+        return results
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+
+    levels = [int(arg) for arg in args if arg.isdigit() and 1 <= int(arg) <= 20]
+    runner = Runner(
+        "--optimal" in args,
+        "astar" if "--astar" in args else "dfs",
+        "pixels" if "--pixel-capture" in args else "screenshot",
+    )
+
+    start_time = time.perf_counter()
+    asyncio.run(runner.run(levels or list(range(1, 21))))
+    end_time = time.perf_counter()
+
+    for level, stages in runner.timings.items():
+        times = ", ".join(
+            f"{stage} {seconds:.2f} s" for stage, seconds in stages.items()
+        )
+        print(f"Level {level}: {times}")
+    print(f"Total {end_time - start_time:.2f} s")
@@ -0,0 +1,162 @@
+import heapq
+from itertools import count
+from typing import Dict, List, Tuple
+
+import graph
+from bitboard import Level, State
+from budget import Budget
+from logs import LOGGER
+from stats import Stats
+
+
+class AStar:
+    # best first search over the same moves as graph.Node, without recursion,
+    # weight 1 gives the shortest solution and larger weights find one faster
+    def __init__(
+        self,
+        board,
+        start: Tuple[int, int],
+        end: Tuple[int, int],
+        has_key: bool = False,
+        weight: float = 1,
+        logging: bool = True,
+        stats: Stats = None,
+        budget: Budget = None,
+    ):
+        grid = graph.Board(board, True)
+        self.level = Level(grid.height, grid.width)
+        self.state: State = self.level.create(
+            grid.grid, start, has_key, grid.get_total_diamonds()
+        )
+        self.end = self.level.index(end)
+        self.weight = weight
+        self.logging = logging
+        self.movement = ""
+
+        # counters and limits of the search, like in graph.Node
+        self.stats = stats
+        self.budget = budget
+
+        # remaining diamonds -> minimum spanning tree over them and the exit
+        self.spanning_trees: Dict[int, int] = {}
+
+    def distance(self, a: int, b: int):
+        ax, ay = divmod(a, self.level.cols)
+        bx, by = divmod(b, self.level.cols)
+        return abs(ax - bx) + abs(ay - by)
+
+    def spanning_tree(self, diamonds: int):
+        if diamonds in self.spanning_trees:
+            return self.spanning_trees[diamonds]
+
+        # prim over manhattan distances
+        cells = list(self.level.cells(diamonds)) + [self.end]
+        closest = {cell: self.distance(cell, cells[0]) for cell in cells[1:]}
+        weight = 0
+        while closest:
+            cell = min(closest, key=closest.get)
+            weight += closest.pop(cell)
+            for other in closest:
+                closest[other] = min(closest[other], self.distance(cell, other))
+
+        self.spanning_trees[diamonds] = weight
+        return weight
+
+    def heuristic(self, state: State):
+        # the player walks to one of the diamonds or the exit and then visits
+        # all of them, which is never shorter than the spanning tree
+        cells = self.level.cells(state.diamonds | (1 << self.end))
+        nearest = min(self.distance(state.pos, cell) for cell in cells)
+        return nearest + self.spanning_tree(state.diamonds)
+
+    def successors(self, state: State):
+        stats = self.stats
+        if stats is not None:
+            stats.path_searches += 1
+            start = stats.start()
+            tree = self.level.explore(state)
+            stats.stop("explore", start)
+        else:
+            tree = self.level.explore(state)
+
+        successors: List[Tuple[str, State]] = []
+        for _, end, push in self.level.moves(
+            state, tree, self.level.cells(state.rocks)
+        ):
+            path = self.level.get_path(tree, end) + push
+            walked = self.level.walk(state, path)
+
+            if not walked.rocks & (1 << walked.pos):
+                successors.append((path, walked))
+                continue
+
+            target = self.level.step(walked.pos, path[-1])
+            pushed = None if target is None else self.level.push(walked, target)
+            if pushed is None:
+                continue
+
+            # pressing a button opens one of the doors, trying each is free
+            doors = list(self.level.cells(pushed.doors))
+            if state.buttons & (1 << target) and doors:
+                for door in doors:
+                    successors.append((path, self.level.open_door(pushed, door)))
+            else:
+                successors.append((path, pushed))
+
+        return successors
+
+    def solve(self):
+        stats = self.stats
+        budget = self.budget
+        tie = count()
+
+        # zobrist -> (parent zobrist, path from the parent)
+        parents: Dict[int, Tuple[int, str]] = {self.state.zobrist: (None, "")}
+        costs: Dict[int, int] = {self.state.zobrist: 0}
+        queue = [(self.heuristic(self.state), next(tie), 0, 0, self.state)]
+
+        while queue:
+            _, _, cost, depth, state = heapq.heappop(queue)
+            if cost > costs[state.zobrist]:
+                continue
+
+            if state.pos == self.end:
+                self.movement = self.get_movement(parents, state.zobrist)
+                if self.logging:
+                    LOGGER.debug("Exit found with path %s", self.movement)
+                if budget is not None:
+                    budget.found(self.movement)
+                return True
+
+            # the first solution is the only one, there is no best so far
+            if budget is not None and budget.spent():
+                break
+
+            if stats is not None:
+                stats.nodes += 1
+                stats.max_depth = max(stats.max_depth, depth)
+
+            for path, successor in self.successors(state):
+                successor_cost = cost + len(path)
+                if costs.get(successor.zobrist, successor_cost + 1) <= successor_cost:
+                    if stats is not None:
+                        stats.pruned += 1
+                    continue
+
+                costs[successor.zobrist] = successor_cost
+                parents[successor.zobrist] = (state.zobrist, path)
+                estimate = successor_cost + self.weight * self.heuristic(successor)
+                heapq.heappush(
+                    queue, (estimate, next(tie), successor_cost, depth + 1, successor)
+                )
+
+        if self.logging:
+            LOGGER.debug("Player failed to reach the end")
+        return False
+
+    def get_movement(self, parents: Dict[int, Tuple[int, str]], zobrist: int):
+        paths = []
+        while zobrist is not None:
+            zobrist, path = parents[zobrist]
+            paths.append(path)
+        return "".join(reversed(paths))
@@ -0,0 +1,60 @@
+import hashlib
+import os
+from typing import Optional
+
+from graph import SOLVER_VERSION
+
+DEFAULT_PATH = os.path.join(os.path.dirname(__file__), "..", "solutions.sqlite3")
+
+
+class SolutionStore:
+    def __init__(self, path: str = DEFAULT_PATH):
+        import sqlite3
+
+        self.connection = sqlite3.connect(path, timeout=30)
+        self.connection.execute(
+            "CREATE TABLE IF NOT EXISTS solutions ("
+            " board TEXT NOT NULL,"
+            " optimal INTEGER NOT NULL,"
+            " version INTEGER NOT NULL,"
+            " movement TEXT NOT NULL,"
+            " PRIMARY KEY (board, optimal))"
+        )
+        # solutions from other solver versions may not be valid anymore
+        self.connection.execute(
+            "DELETE FROM solutions WHERE version != ?", (SOLVER_VERSION,)
+        )
+        self.connection.commit()
+
+    def key(self, board, engine: str):
+        # each engine finds its own solutions, even in the same mode
+        text = "\n".join([engine] + ["".join(row) for row in board])
+        return hashlib.sha1(text.encode()).hexdigest()
+
+    def get(self, board, optimal: bool, engine: str = "dfs") -> Optional[str]:
+        row = self.connection.execute(
+            "SELECT movement FROM solutions WHERE board = ? AND optimal = ?",
+            (self.key(board, engine), int(optimal)),
+        ).fetchone()
+
+        return None if row is None else row[0]
+
+    def put(self, board, optimal: bool, movement: str, engine: str = "dfs"):
+        self.connection.execute(
+            "INSERT OR REPLACE INTO solutions VALUES (?, ?, ?, ?)",
+            (self.key(board, engine), int(optimal), SOLVER_VERSION, movement),
+        )
+        self.connection.commit()
+
+    def close(self):
+        self.connection.close()
+
+
+STORE: Optional[SolutionStore] = None
+
+
+def get_store():
+    global STORE
+    if STORE is None:
+        STORE = SolutionStore()
+    return STORE
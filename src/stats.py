@@ -0,0 +1,56 @@
+import time
+from typing import Dict
+
+COUNTERS = (
+    "nodes",
+    "memo_hits",
+    "memo_misses",
+    "path_searches",
+    "pruned",
+    "max_depth",
+)
+
+
+class Stats:
+    # counters of one search, graph.Node and search.AStar only update them
+    # when they are given a Stats so searches without one pay nothing
+    def __init__(self, timers: bool = False):
+        self.nodes = 0  # nodes expanded
+        self.memo_hits = 0
+        self.memo_misses = 0
+        self.path_searches = 0
+        self.pruned = 0  # moves dropped by the bound or a repeated push
+        self.max_depth = 0
+
+        # seconds spent in each phase, only measured when asked for
+        self.timers: Dict[str, float] = {} if timers else None
+
+    def __repr__(self):
+        return str(self.as_dict())
+
+    def start(self):
+        return time.perf_counter() if self.timers is not None else 0.0
+
+    def stop(self, phase: str, start: float):
+        if self.timers is not None:
+            elapsed = time.perf_counter() - start
+            self.timers[phase] = self.timers.get(phase, 0.0) + elapsed
+
+    def merge(self, other: "Stats"):
+        for name in COUNTERS:
+            if name == "max_depth":
+                self.max_depth = max(self.max_depth, other.max_depth)
+            else:
+                setattr(self, name, getattr(self, name) + getattr(other, name))
+
+        if self.timers is not None and other.timers is not None:
+            for phase, seconds in other.timers.items():
+                self.timers[phase] = self.timers.get(phase, 0.0) + seconds
+
+    def as_dict(self):
+        result = {name: getattr(self, name) for name in COUNTERS}
+        if self.timers is not None:
+            result["timers"] = {
+                phase: round(seconds, 6) for phase, seconds in self.timers.items()
+            }
+        return result
@@ -0,0 +1,29 @@
+from collections import OrderedDict
+from typing import Optional, Tuple
+
+
+class TranspositionTable:
+    def __init__(self, max_entries: int = 200_000):
+        self.max_entries = max_entries
+        # key -> (movement, bound it was searched with)
+        self.entries: "OrderedDict[int, Tuple[str, int]]" = OrderedDict()
+
+    def __len__(self):
+        return len(self.entries)
+
+    def get(self, key: int) -> Optional[Tuple[str, int]]:
+        entry = self.entries.get(key)
+        if entry is not None:
+            self.entries.move_to_end(key)
+        return entry
+
+    def put(self, key: int, movement: str, bound: int):
+        self.entries[key] = (movement, bound)
+        self.entries.move_to_end(key)
+
+        # least recently used entries go first
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+
+    def clear(self):
+        self.entries.clear()
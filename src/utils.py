@@ -1,4 +1,5 @@
-from queue import PriorityQueue
+from heapq import heappop, heappush
+from typing import List, Optional
 
 UP = "↑"
 DOWN = "↓"
@@ -7,80 +8,112 @@ RIGHT = "→"
 
 
 def path_to_movement(path):
-    movement = ""
-    if len(path) == 0:
-        return movement
+    movement = []
     for i in range(len(path) - 1):
         x1, y1 = path[i].get_pos()
         x2, y2 = path[i + 1].get_pos()
 
         if x1 < x2:
-            movement += DOWN
+            movement.append(DOWN)
         elif x1 > x2:
-            movement += UP
+            movement.append(UP)
         elif y1 < y2:
-            movement += RIGHT
+            movement.append(RIGHT)
         elif y1 > y2:
-            movement += LEFT
+            movement.append(LEFT)
+
+    return "".join(movement)
+
+
+class PathFinder:
+    # A* over flat cell indices (x * cols + y), the buffers are reused between
+    # searches and a search counter tells which entries belong to this search
+    def __init__(self):
+        self.size = 0
+        self.g_score: List[int] = []
+        self.came_from: List[int] = []
+        self.seen: List[int] = []
+        self.search = 0
+
+    def reserve(self, size: int):
+        if size > self.size:
+            self.g_score.extend([0] * (size - self.size))
+            self.came_from.extend([0] * (size - self.size))
+            self.seen.extend([0] * (size - self.size))
+            self.size = size
+
+    def find(
+        self, neighbors: List[List[int]], cols: int, start: int, end: int
+    ) -> Optional[str]:
+        if start == end:
+            return ""
+
+        self.reserve(len(neighbors))
+        self.search += 1
+        search = self.search
+        g_score = self.g_score
+        came_from = self.came_from
+        seen = self.seen
+
+        ex, ey = divmod(end, cols)
+
+        count = 0
+        open_set = [(0, count, start)]
+        open_set_hash = {start}
+        g_score[start] = 0
+        seen[start] = search
+
+        while open_set:
+            current = heappop(open_set)[2]
+            open_set_hash.remove(current)
+
+            if current == end:
+                return self.movement(cols, start, end)
 
-    return movement
-
-
-def a_star(grid, start, end):
-    if start.x == end.x and start.y == end.y:
-        return ""
-    # Manhattan distance
-    def h(p1, p2):
-        x1, y1 = p1
-        x2, y2 = p2
-
-        return abs(x1 - x2) + abs(y1 - y2)
-
-    count = 0
-
-    open_set = PriorityQueue()
-    open_set.put((0, count, start))
-
-    came_from = {}
-
-    g_score = {cell: float("inf") for row in grid for cell in row}
-    g_score[start] = 0
+            temp_g_score = g_score[current] + 1
+            for neighbor in neighbors[current]:
+                if seen[neighbor] == search and temp_g_score >= g_score[neighbor]:
+                    continue
 
-    f_score = {cell: float("inf") for row in grid for cell in row}
-    f_score[start] = h(start.get_pos(), end.get_pos())
+                came_from[neighbor] = current
+                g_score[neighbor] = temp_g_score
+                seen[neighbor] = search
 
-    open_set_hash = {start}
+                if neighbor not in open_set_hash:
+                    x, y = divmod(neighbor, cols)
+                    count += 1
+                    f_score = temp_g_score + abs(x - ex) + abs(y - ey)
+                    heappush(open_set, (f_score, count, neighbor))
+                    open_set_hash.add(neighbor)
 
-    while not open_set.empty():
-        current = open_set.get()[2]
-        open_set_hash.remove(current)
+        return None
 
-        if current == end:
-            path = []
+    def movement(self, cols: int, start: int, end: int):
+        moves = {cols: DOWN, -cols: UP, 1: RIGHT, -1: LEFT}
+        movement = []
 
-            while current in came_from:
-                path.append(current)
-                current = came_from[current]
+        while end != start:
+            previous = self.came_from[end]
+            movement.append(moves[end - previous])
+            end = previous
 
-            path.append(start)
+        return "".join(reversed(movement))
 
-            return path_to_movement(path[::-1])
 
-        for neighbor in current.neighbors:
-            temp_g_score = g_score[current] + 1
+PATH_FINDER = PathFinder()
 
-            if temp_g_score < g_score[neighbor]:
-                came_from[neighbor] = current
-                g_score[neighbor] = temp_g_score
-                f_score[neighbor] = temp_g_score + h(neighbor.get_pos(), end.get_pos())
 
-                if neighbor not in open_set_hash:
-                    count += 1
-                    open_set.put((f_score[neighbor], count, neighbor))
-                    open_set_hash.add(neighbor)
-                    neighbor.make_open()
+def a_star(grid, start, end):
+    if start.x == end.x and start.y == end.y:
+        return ""
 
-        if current != start:
-            current.make_closed()
+    cols = len(grid[0])
+    neighbors = [
+        [neighbor.x * cols + neighbor.y for neighbor in cell.neighbors]
+        for row in grid
+        for cell in row
+    ]
 
-    return None
+    return PATH_FINDER.find(
+        neighbors, cols, start.x * cols + start.y, end.x * cols + end.y
+    )
@@ -0,0 +1,7 @@
+import os
+import sys
+
+# the modules in src import each other by bare name
+SRC = os.path.join(os.path.dirname(__file__), "..", "src")
+
+sys.path.insert(0, os.path.abspath(SRC))
@@ -0,0 +1,26 @@
+import io
+import json
+import os
+
+import batch
+
+LEVELS = os.path.join(os.path.dirname(__file__), "..", "levels")
+
+
+def test_one_worker_solves_every_level_alone():
+    # the same worker solves the levels one after another and must find
+    # what a fresh process would
+    paths = [os.path.join(LEVELS, f"synthetic_0{i}.txt") for i in (8, 2, 5, 2)]
+    output = io.StringIO()
+    results = batch.solve_batch(paths, output, workers=1)
+
+    lengths = sorted(
+        (os.path.basename(result["level"]), result["length"]) for result in results
+    )
+    assert lengths == [
+        ("synthetic_02.txt", 28),
+        ("synthetic_02.txt", 28),
+        ("synthetic_05.txt", 54),
+        ("synthetic_08.txt", 34),
+    ]
+    assert [json.loads(line) for line in output.getvalue().splitlines()] == results
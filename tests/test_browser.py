@@ -0,0 +1,129 @@
+import os
+
+import pytest
+
+np = pytest.importorskip("numpy")
+pytest.importorskip("selenium")
+img_proc = pytest.importorskip("image_processing", exc_type=ImportError)
+browser = pytest.importorskip("browser", exc_type=ImportError)
+
+import main
+import offline
+import runner
+import solutions
+
+LEVELS = os.path.join(os.path.dirname(__file__), "..", "levels")
+
+
+class StandIn(browser.Browser):
+    # plays back canvas hashes and cropped boards instead of a driver
+    def __init__(self, frames):
+        self.frames = frames
+        self.frame = None
+
+    def canvas_hash(self):
+        if not self.frames:
+            return None
+        canvas_hash, self.frame = self.frames.pop(0)
+        return canvas_hash
+
+    def get_board(self, crop=None, capture=None):
+        return self.frame
+
+    def move(self, movements, press_time=None, release_time=None, verify=None):
+        self.played = movements
+        return True
+
+
+def capture(level):
+    # a little noise, exact copies of the tileset never match themselves
+    image = img_proc.recreate_board(np.array(level), 8, 12)
+    noise = np.random.default_rng(7).normal(0, 4, image.shape)
+    return np.clip(image + noise, 0, 255).astype(np.uint8)
+
+
+def test_wait_until_ready_with_recognizer():
+    level = offline.load_board(os.path.join(LEVELS, "synthetic_08.txt"))
+    image = capture(level)
+    blank = np.zeros_like(image)
+
+    # every poll gets a new hash, so each board is recognized again and
+    # compared with the last one
+    frames = [(None, None), (1, blank)] + [(i, image) for i in range(2, 6)]
+    board = StandIn(frames).wait_until_ready(
+        timeout=5, interval=0, recognizer=img_proc.BoardRecognizer()
+    )
+
+    assert board is not None
+    assert board.tolist() == [list(row) for row in level]
+
+
+def test_wait_until_ready_times_out():
+    level = offline.load_board(os.path.join(LEVELS, "synthetic_08.txt"))
+    blank = np.zeros_like(capture(level))
+
+    frames = [(i, blank) for i in range(1000)]
+    assert StandIn(frames).wait_until_ready(timeout=0.2, interval=0) is None
+
+
+class Driver:
+    # records the context every script runs in, the page or the game frame
+    def __init__(self):
+        self.context = "page"
+        self.scripts = []
+        self.switch_to = self
+
+    def find_element(self, by, value):
+        return value
+
+    def frame(self, iframe):
+        self.context = "frame"
+
+    def default_content(self):
+        self.context = "page"
+
+    def refresh(self):
+        self.context = "page"
+
+    def execute_script(self, script, *args):
+        self.scripts.append((self.context, script))
+
+
+def test_levels_are_stored_by_the_game_frame():
+    player = StandIn([])
+    player.driver = Driver()
+    player.driver.frame("iframe")
+
+    player.unlock_all_levels()
+    player.select_level(3)
+    player.select_level(4)
+
+    contexts = {context for context, script in player.driver.scripts}
+    assert contexts == {"frame"}
+    assert "'levelToStart','Level 4'" in player.driver.scripts[-1][1]
+    assert player.driver.context == "frame"
+
+
+def test_start_game_waits_for_the_board(tmp_path, monkeypatch):
+    monkeypatch.setattr(
+        solutions, "STORE", solutions.SolutionStore(str(tmp_path / "s"))
+    )
+    monkeypatch.setattr(main, "recognizer", None)
+    level = offline.load_board(os.path.join(LEVELS, "synthetic_08.txt"))
+    image = capture(level)
+
+    # still loading when the game starts, as after unlock_all_levels
+    player = StandIn([(None, None), (1, np.zeros_like(image))] + [(2, image)] * 4)
+    main.start_game(player, logging=False)
+
+    assert len(player.played) == 34
+
+
+def test_play_level_reports_a_level_that_never_loads(monkeypatch, capsys):
+    monkeypatch.setattr(runner, "READY_TIMEOUT", 0.1)
+    player = StandIn([])
+    player.driver = Driver()
+
+    assert runner.play_level(player, 5, "→")
+    assert player.played == "→"
+    assert "Level 5 didn't look ready" in capsys.readouterr().out
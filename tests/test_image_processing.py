@@ -0,0 +1,86 @@
+import os
+
+import pytest
+
+np = pytest.importorskip("numpy")
+img_proc = pytest.importorskip("image_processing", exc_type=ImportError)
+
+import offline
+
+LEVELS = os.path.join(os.path.dirname(__file__), "..", "levels")
+
+
+def classify_slowly(tiles, templates, error_margin, default_value):
+    # one matchTemplate per pair, what classify_tiles has to agree with
+    results = []
+    for i, tile in enumerate(tiles):
+        max_val, max_index = 0, 0
+        if i < 8:
+            tile = img_proc.crop_img(tile, 1, 2, top=1)
+
+        for j, template in enumerate(templates):
+            if i < 8:
+                template = img_proc.crop_img(template, 1, 2, top=1)
+
+            val = img_proc.compare_tiles(tile, template)
+            if val > max_val and val != 1:
+                max_val = val
+                max_index = j
+        if max_val < error_margin:
+            max_index = default_value
+
+        results.append(max_index)
+    return np.array(results)
+
+
+def check_parity(tiles):
+    templates = img_proc.get_templates()
+    for error_margin, default_value in ((0.9, -1), (0.5, 13)):
+        fast = img_proc.classify_tiles(tiles, templates, error_margin, default_value)
+        slow = classify_slowly(tiles, templates.tiles, error_margin, default_value)
+        assert fast.tolist() == slow.tolist()
+
+
+def test_clean_tiles_match_opencv():
+    templates = img_proc.get_templates().tiles
+    choice = np.random.default_rng(7).integers(len(templates), size=96)
+    check_parity([templates[i] for i in choice])
+
+
+def test_noisy_tiles_match_opencv():
+    templates = img_proc.get_templates().tiles
+    rng = np.random.default_rng(7)
+    tiles = []
+    for i in rng.integers(len(templates), size=96):
+        noise = rng.normal(0, 12, templates[i].shape)
+        tiles.append(np.clip(templates[i] + noise, 0, 255).astype(np.uint8))
+    check_parity(tiles)
+
+
+def test_recreated_board_matches_opencv():
+    level = offline.load_board(os.path.join(LEVELS, "synthetic_08.txt"))
+    board = img_proc.recreate_board(np.array(level), 8, 12)
+    check_parity(img_proc.get_tiles(board, 8, 12))
+
+    # closed doors are told apart from the path
+    labels = img_proc.process_board(board, cropped=True)
+    assert labels[4][3] == labels[7][4] == "C"
+
+
+def test_templates_cache(tmp_path, monkeypatch):
+    cache = tmp_path / "tileset.npz"
+    monkeypatch.setattr(img_proc, "TEMPLATES_CACHE", str(cache))
+
+    made = img_proc.load_templates()
+    assert [path.name for path in tmp_path.iterdir()] == ["tileset.npz"]
+    loaded = img_proc.load_templates()
+    assert np.array_equal(loaded.normalized, made.normalized)
+
+    # half written or older caches are made again
+    cache.write_bytes(cache.read_bytes()[:100])
+    assert np.array_equal(img_proc.load_templates().halves, made.halves)
+
+    monkeypatch.setattr(img_proc, "TEMPLATES_FORMAT", img_proc.TEMPLATES_FORMAT + 1)
+    stale = cache.stat().st_mtime_ns
+    img_proc.load_templates()
+    assert cache.stat().st_mtime_ns != stale
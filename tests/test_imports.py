@@ -0,0 +1,11 @@
+import pytest
+
+import benchmark
+
+
+@pytest.mark.parametrize("module", benchmark.IMPORT_MODULES)
+def test_solver_imports_are_light(module):
+    result = benchmark.check_imports(module)
+
+    assert result["heavy_modules"] == []
+    assert result["import_ms"] <= result["budget_ms"]
@@ -0,0 +1,74 @@
+import os
+
+import ai
+import graph
+import offline
+import solutions
+from budget import Budget
+from stats import Stats
+
+LEVELS = os.path.join(os.path.dirname(__file__), "..", "levels")
+
+
+def test_engines_are_stored_apart(tmp_path):
+    store = solutions.SolutionStore(str(tmp_path / "solutions.sqlite3"))
+    board = ["#PE"]
+
+    store.put(board, False, "→→", "dfs")
+    assert store.get(board, False, "dfs") == "→→"
+    assert store.get(board, False, "astar") is None
+    assert store.get(board, True, "dfs") is None
+    store.close()
+
+
+def test_old_versions_are_discarded(tmp_path):
+    path = str(tmp_path / "solutions.sqlite3")
+    store = solutions.SolutionStore(path)
+    store.connection.execute(
+        "INSERT INTO solutions VALUES (?, ?, ?, ?)",
+        (store.key(["#PE"], "dfs"), 0, graph.SOLVER_VERSION - 1, "→→"),
+    )
+    store.connection.commit()
+    store.close()
+
+    store = solutions.SolutionStore(path)
+    assert store.get(["#PE"], False) is None
+    store.close()
+
+
+def test_cache_keeps_each_engine_result(tmp_path, monkeypatch):
+    store = solutions.SolutionStore(str(tmp_path / "solutions.sqlite3"))
+    monkeypatch.setattr(solutions, "STORE", store)
+    board = offline.load_board(os.path.join(LEVELS, "synthetic_08.txt"))
+
+    # greedy dfs and greedy a* find different solutions on this level
+    for _ in range(2):
+        dfs = ai.get_movement_from_array(board, logging=False)
+        astar = ai.get_movement_from_array(board, logging=False, engine="astar")
+        assert (len(dfs), len(astar)) == (34, 36)
+    store.close()
+
+
+def test_stats_always_search(tmp_path, monkeypatch):
+    store = solutions.SolutionStore(str(tmp_path / "solutions.sqlite3"))
+    monkeypatch.setattr(solutions, "STORE", store)
+    board = offline.load_board(os.path.join(LEVELS, "synthetic_02.txt"))
+
+    for _ in range(2):
+        stats = Stats()
+        ai.get_movement_from_array(board, logging=False, stats=stats)
+        assert stats.nodes > 0
+    store.close()
+
+
+def test_budget_sees_stored_solution(tmp_path, monkeypatch):
+    store = solutions.SolutionStore(str(tmp_path / "solutions.sqlite3"))
+    monkeypatch.setattr(solutions, "STORE", store)
+    board = offline.load_board(os.path.join(LEVELS, "synthetic_02.txt"))
+
+    movement = ai.get_movement_from_array(board, logging=False)
+    found = []
+    budget = Budget(nodes=10, on_solution=found.append)
+    assert ai.get_movement_from_array(board, logging=False, budget=budget) == movement
+    assert budget.best == movement and found == [movement]
+    store.close()
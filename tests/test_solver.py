@@ -0,0 +1,166 @@
+import os
+import threading
+import time
+
+import pytest
+
+import ai
+import benchmark
+import graph
+import offline
+import search
+from budget import Budget
+from stats import Stats
+
+LEVELS = os.path.join(os.path.dirname(__file__), "..", "levels")
+
+# level -> solution length of greedy dfs, optimal dfs, greedy and optimal a*,
+# None where the search takes more than a few seconds
+LENGTHS = {
+    "synthetic_01": (30, 30, 30, 30),
+    "synthetic_02": (28, 24, 24, 24),
+    "synthetic_03": (28, 28, 28, 28),
+    "synthetic_04": (90, None, 34, None),
+    "synthetic_05": (54, None, 34, 34),
+    "synthetic_06": (38, 34, 34, 34),
+    "synthetic_07": (42, None, 34, 34),
+    "synthetic_08": (34, 30, 36, 30),
+}
+MODES = (("dfs", False), ("dfs", True), ("astar", False), ("astar", True))
+
+
+def load(name):
+    return offline.load_board(os.path.join(LEVELS, f"{name}.txt"))
+
+
+def solve(board, **kwargs):
+    return ai.get_movement_from_array(board, logging=False, cache=False, **kwargs)
+
+
+@pytest.mark.parametrize("name", sorted(LENGTHS))
+def test_solution_lengths(name):
+    board = load(name)
+    for (engine, optimal), length in zip(MODES, LENGTHS[name]):
+        if length is not None:
+            movement = solve(board, engine=engine, optimal=optimal)
+            assert len(movement) == length, (engine, optimal)
+
+
+@pytest.mark.parametrize("name", ["synthetic_02", "synthetic_04", "synthetic_08"])
+def test_incremental_hash(name):
+    board = load(name)
+    start, end = benchmark.find_ends(board)
+    player = search.AStar(board, start, end, logging=False)
+
+    # every state reached by walking, pushing and opening doors keeps the
+    # hash it would get from scratch
+    queue = [player.state]
+    seen = {player.state.zobrist}
+    while queue and len(seen) < 500:
+        state = queue.pop()
+        assert state.zobrist == player.level.hash(state)
+        for _, successor in player.successors(state):
+            if successor.zobrist not in seen:
+                seen.add(successor.zobrist)
+                queue.append(successor)
+
+
+def check_undo(node: graph.Node, depth: int):
+    tree, moves = node.get_interest_points()
+    for _, end, push in moves:
+        rocks = list(node.rocks.items())
+        memo = list(node.rock_movement_memo.items())
+
+        path = node.level.get_path(tree, end) + push
+        child = node.child(path)
+        if child.move(path) is not False and depth > 1:
+            check_undo(child, depth - 1)
+        child.undo()
+
+        assert list(node.rocks.items()) == rocks
+        assert list(node.rock_movement_memo.items()) == memo
+
+
+@pytest.mark.parametrize("name", ["synthetic_02", "synthetic_04", "synthetic_08"])
+def test_undo_restores_shared_state(name):
+    board = load(name)
+    start, end = benchmark.find_ends(board)
+
+    node = graph.Node(board, start, end, logging=False)
+    check_undo(node, 3)
+
+    rocks = list(node.rocks.items())
+    assert node.solve()
+    assert list(node.rocks.items()) == rocks
+    assert node.rock_movement_memo == {}
+
+
+@pytest.mark.parametrize("name", ["synthetic_02", "synthetic_03", "synthetic_08"])
+@pytest.mark.parametrize("optimal", [False, True])
+def test_parallel_matches_serial(name, optimal):
+    board = load(name)
+    serial = solve(board, optimal=optimal)
+    assert solve(board, optimal=optimal, workers=2) == serial
+
+
+def test_budget_node_cap():
+    found = []
+    budget = Budget(nodes=200, on_solution=found.append)
+    movement = solve(load("synthetic_04"), optimal=True, budget=budget)
+
+    assert budget.exhausted
+    assert budget.expanded == 201
+    assert movement != "" and movement == budget.best == found[-1]
+    # every solution reported is shorter than the one before
+    assert all(len(a) > len(b) for a, b in zip(found, found[1:]))
+
+
+def test_budget_deadline():
+    budget = Budget(deadline=0.2)
+    start = time.perf_counter()
+    movement = solve(load("synthetic_04"), optimal=True, budget=budget)
+
+    assert budget.exhausted
+    assert time.perf_counter() - start < 2
+    assert movement == budget.best
+
+
+def test_budget_cancel():
+    cancel = threading.Event()
+    budget = Budget(cancel=cancel)
+    threading.Timer(0.1, cancel.set).start()
+    start = time.perf_counter()
+    solve(load("synthetic_04"), optimal=True, budget=budget)
+
+    assert budget.exhausted
+    assert time.perf_counter() - start < 2
+
+
+def test_budget_left_unused():
+    board = load("synthetic_08")
+    budget = Budget(deadline=60, nodes=10**6)
+
+    assert solve(board, optimal=True, budget=budget) == solve(board, optimal=True)
+    assert not budget.exhausted
+
+
+def test_searches_on_other_threads_keep_their_budget():
+    board = load("synthetic_04")
+    cancel = threading.Event()
+    budget = Budget(cancel=cancel)
+    worker = threading.Thread(
+        target=solve, args=(board,), kwargs={"optimal": True, "budget": budget}
+    )
+    worker.start()
+
+    # searches ending on this thread leave the other one alone
+    for name in ("synthetic_02", "synthetic_08"):
+        stats = Stats()
+        expected = solve(load(name))
+        assert solve(load(name), stats=stats) == expected
+        assert stats.nodes > 0
+
+    cancel.set()
+    worker.join(5)
+    assert not worker.is_alive()
+    assert budget.exhausted and budget.best is not None